@@ -1,11 +1,45 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Location, Post
+from .forms import UploadErrorsForm
+from .models import Category, Comment, Location, Post, TitleTrigram
+from .trigrams import find_similar
 
 admin.site.empty_value_display = 'Не указано'
 
 
-class PostAdmin(admin.ModelAdmin):
+class TrigramSearchMixin:
+    """Дополняет поиск в админке заголовками, похожими на запрос."""
+
+    trigram_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            similar = [
+                object_id for object_id, _ in find_similar(
+                    self.trigram_kind, search_term
+                )
+            ]
+            results |= queryset.filter(pk__in=similar)
+        return results, may_have_duplicates
+
+
+class UploadErrorsAdminMixin:
+    """Передаёт форме админки ошибки загрузки файлов из запроса."""
+
+    form = UploadErrorsForm
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        upload_errors = getattr(request, 'upload_errors', None)
+        if not upload_errors:
+            return form
+        return type(form.__name__, (form,), {'upload_errors': upload_errors})
+
+
+class PostAdmin(UploadErrorsAdminMixin, TrigramSearchMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'author',
@@ -17,13 +51,14 @@ class PostAdmin(admin.ModelAdmin):
     )
     list_editable = ('is_published',)
     search_fields = ('title',)
+    trigram_kind = TitleTrigram.POST
     list_display_links = ('title',)
     list_filter = (
         'category', 'location'
     )
 
 
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(TrigramSearchMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'is_published',
@@ -35,6 +70,7 @@ class CategoryAdmin(admin.ModelAdmin):
         'is_published', 'description'
     )
     search_fields = ('title',)
+    trigram_kind = TitleTrigram.CATEGORY
 
 
 class LocationAdmin(admin.ModelAdmin):
@@ -0,0 +1,252 @@
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from .models import AutocompleteChange, Category, FeedEntry, Post
+
+User = get_user_model()
+
+POST = 'post'
+CATEGORY = 'category'
+USER = 'user'
+# Количество хранимых изменений индекса; процесс, отставший сильнее,
+# перестраивает индекс целиком
+KEEP_CHANGES = 10000
+# Старые изменения удаляются при записи каждого такого по счёту
+PRUNE_EVERY = 1000
+# Длина заголовка, хранимая в индексе
+MAX_LABEL_LENGTH = 64
+# Минимальная длина запроса и количество подсказок
+MIN_QUERY_LENGTH = 2
+LIMIT = 10
+SEPARATOR = '\x00'
+
+
+def normalize(text):
+    return text.lower().replace('ё', 'е')
+
+
+def make_key(kind, object_id, label, extra=''):
+    """
+    Строка индекса: нормализованный заголовок, тип, id, дополнительное
+    поле (время публикации поста или slug категории) и заголовок.
+    Сортировка строк совпадает с сортировкой заголовков.
+    """
+    label = label[:MAX_LABEL_LENGTH]
+    return SEPARATOR.join(
+        (normalize(label), kind, str(object_id), str(extra), label)
+    )
+
+
+def post_key(post_id, title, pub_date):
+    # Дата может быть ещё не приведена к datetime после присваивания
+    pub_date = Post._meta.get_field('pub_date').to_python(pub_date)
+    return make_key(POST, post_id, title, int(pub_date.timestamp()))
+
+
+def category_key(category):
+    return make_key(CATEGORY, category.pk, category.title, category.slug)
+
+
+def user_key(user):
+    return make_key(USER, user.pk, user.username)
+
+
+class PrefixIndex:
+    """
+    Отсортированный массив строк индекса с поиском по префиксу через
+    bisect; словари по типам объектов хранят строку каждого объекта
+    для обновления и удаления.
+    """
+
+    def __init__(self, sequence=0):
+        self.sequence = sequence
+        self.keys = []
+        self.objects = {POST: {}, CATEGORY: {}, USER: {}}
+
+    @classmethod
+    def from_keys(cls, keys, sequence=0):
+        index = cls(sequence)
+        index.keys = sorted(keys)
+        for key in index.keys:
+            _, kind, object_id, _ = key.split(SEPARATOR, 3)
+            index.objects[kind][int(object_id)] = key
+        return index
+
+    def remove(self, kind, object_id):
+        key = self.objects[kind].pop(object_id, None)
+        if key is not None:
+            position = bisect_left(self.keys, key)
+            if position < len(self.keys) and self.keys[position] == key:
+                del self.keys[position]
+
+    def update(self, kind, object_id, key):
+        """Добавляет, заменяет или, если key равен None, удаляет объект."""
+        self.remove(kind, object_id)
+        if key is not None:
+            insort(self.keys, key)
+            self.objects[kind][object_id] = key
+
+    def search(self, prefix, limit=LIMIT, now=None):
+        """Объекты с заголовком, начинающимся с prefix; посты - вышедшие."""
+        now = time.time() if now is None else now
+        prefix = normalize(prefix)
+        results = []
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and len(results) < limit:
+            key = self.keys[position]
+            position += 1
+            if not key.startswith(prefix):
+                break
+            _, kind, object_id, extra, label = key.split(SEPARATOR, 4)
+            if kind == POST and int(extra) > now:
+                continue
+            results.append((kind, int(object_id), extra, label))
+        return results
+
+    def stats(self):
+        """Количество объектов и занимаемая индексом память в байтах."""
+        memory = sys.getsizeof(self.keys) + sum(
+            sys.getsizeof(key) for key in self.keys
+        )
+        for objects in self.objects.values():
+            memory += sys.getsizeof(objects) + sum(
+                sys.getsizeof(object_id) for object_id in objects
+            )
+        return {
+            'entries': len(self.keys),
+            'posts': len(self.objects[POST]),
+            'categories': len(self.objects[CATEGORY]),
+            'users': len(self.objects[USER]),
+            'memory_bytes': memory,
+            'sequence': self.sequence,
+        }
+
+
+_index = None
+# Изменения применяются к индексу под _lock; перестраивает индекс
+# один поток под _build_lock, остальные тем временем ищут по старому
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+
+def last_change():
+    return AutocompleteChange.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+
+
+def build():
+    """
+    Индекс по видимым постам, опубликованным категориям и активным
+    пользователям
+    """
+    # Изменения, записанные во время построения, применятся повторно
+    sequence = last_change()
+    keys = [
+        post_key(post_id, title, pub_date)
+        for post_id, title, pub_date in FeedEntry.objects.order_by()
+        .values_list('post_id', 'title', 'pub_date').iterator()
+    ]
+    keys.extend(
+        category_key(category)
+        for category in Category.objects.filter(is_published=True)
+        .only('title', 'slug').iterator()
+    )
+    keys.extend(
+        user_key(user)
+        for user in User.objects.filter(is_active=True)
+        .only('username').iterator()
+    )
+    return PrefixIndex.from_keys(keys, sequence)
+
+
+def apply_changes(index):
+    """
+    Применяет к индексу новые изменения из таблицы; False, если индекс
+    нужно перестроить: изменения пропущены или удалены либо среди них
+    есть сброс.
+    """
+    changes = list(AutocompleteChange.objects.filter(
+        pk__gt=index.sequence
+    ).order_by('pk').values_list('pk', 'kind', 'object_id', 'key'))
+    with _lock:
+        expected = index.sequence + 1
+        for pk, kind, object_id, key in changes:
+            if pk < expected:
+                # Применено другим потоком
+                continue
+            if pk > expected or not kind:
+                return False
+            index.update(kind, object_id, key)
+            index.sequence = pk
+            expected = pk + 1
+    return True
+
+
+def get_index():
+    """
+    Индекс этого процесса с применёнными изменениями из других
+    процессов. Индекс строится при запуске процесса (warm_up) или
+    при первом обращении и перестраивается, если изменения потеряны.
+    """
+    global _index
+    index = _index
+    if index is not None and apply_changes(index):
+        return index
+    # Пока один поток перестраивает индекс, остальные ищут по старому
+    if not _build_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _index is not index:
+            return _index
+        _index = build()
+        apply_changes(_index)
+        return _index
+    finally:
+        _build_lock.release()
+
+
+def publish(kind, object_id, key=None):
+    """
+    Сообщает всем процессам об изменении объекта; key=None - удаление,
+    kind=None - индекс нужно перестроить. Изменение записывается
+    в транзакции, изменившей объект.
+    """
+    change = AutocompleteChange.objects.create(
+        kind=kind or '', object_id=object_id, key=key
+    )
+    if change.pk % PRUNE_EVERY == 0:
+        AutocompleteChange.objects.filter(
+            pk__lte=change.pk - KEEP_CHANGES
+        ).delete()
+
+
+def reset():
+    publish(None, None)
+
+
+def get_url(kind, object_id, extra, label):
+    if kind == POST:
+        return reverse('blog:post_detail', kwargs={'post_id': object_id})
+    if kind == CATEGORY:
+        return reverse('blog:category_posts', kwargs={'category_slug': extra})
+    return reverse('blog:profile', kwargs={'username': label})
+
+
+def lookup(query, limit=LIMIT):
+    query = query.strip()
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+    return [
+        {
+            'type': kind,
+            'label': label,
+            'url': get_url(kind, object_id, extra, label),
+        }
+        for kind, object_id, extra, label in get_index().search(query, limit)
+    ]
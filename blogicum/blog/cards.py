@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from . import images
+from .models import FeedEntry, Post
+
+CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def new_card_version():
+    """Метка версии карточки: микросекунды, не повторяется после отката."""
+    return time.time_ns() // 1000
+
+
+def card_cache_key(post):
+    return f'post_card:{post.pk}:{post.card_version}'
+
+
+def bump_card_versions(**filters):
+    """
+    Делает устаревшими закэшированные карточки постов по фильтру
+    и отмечает посты изменёнными для условных запросов.
+    """
+    version = new_card_version()
+    Post.objects.filter(**filters).update(
+        card_version=version, updated_at=timezone.now()
+    )
+    FeedEntry.objects.filter(**filters).update(card_version=version)
+
+
+def set_comment_count(post_id, count):
+    """
+    Записывает счётчик комментариев (число или выражение F) в пост
+    и его запись ленты и делает карточку поста устаревшей.
+    """
+    version = new_card_version()
+    Post.objects.filter(pk=post_id).update(
+        comment_count=count, card_version=version, updated_at=timezone.now()
+    )
+    FeedEntry.objects.filter(pk=post_id).update(
+        comment_count=count, card_version=version
+    )
+
+
+def render_cards(posts):
+    """
+    HTML карточек постов: все карточки страницы запрашиваются из кэша
+    одним обращением, рендерятся только отсутствующие.
+    """
+    posts = list(posts)
+    keys = [card_cache_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    template = get_template(CARD_TEMPLATE)
+    # Сведения об изображениях нужны только для недостающих карточек
+    images.attach_image_info(
+        post for key, post in zip(keys, posts) if key not in cards
+    )
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missing[key] = cards[key] = template.render({'post': post})
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_page_cache_backend(app_configs, **kwargs):
+    """
+    Кэш страниц сбрасывается по тегам, которые видны всем процессам
+    сервера только в общем кэше. Локальный кэш допустим при DEBUG,
+    когда runserver работает в одном процессе.
+    """
+    if (
+        settings.PAGE_CACHE_ENABLED
+        and not settings.DEBUG
+        and isinstance(caches['default'], LocMemCache)
+    ):
+        return [Error(
+            'Кэш страниц включён, но кэш по умолчанию - LocMemCache:'
+            ' другие процессы будут отдавать устаревшие страницы.',
+            hint='Задайте CACHE_LOCATION или PAGE_CACHE_ENABLED=False.',
+            id='blog.E001',
+        )]
+    return []
@@ -0,0 +1,128 @@
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from hashlib import md5
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Category, FeedEntry, Post
+from .page_cache import FEED_TAG, get_feed_version
+
+User = get_user_model()
+
+
+def conditional_page(validator):
+    """
+    Отвечает 304 на If-None-Match / If-Modified-Since до выполнения
+    представления. validator(request, **kwargs) возвращает
+    (части ETag, дата изменения) или None, если проверка невозможна.
+    ETag учитывает пользователя и токен CSRF: страницы для разных
+    пользователей различаются, а формы содержат токен, который
+    меняется при входе. Авторизованным пользователям Last-Modified
+    не отдаётся.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            validators = validator(request, **kwargs)
+            if validators is None:
+                return view_func(request, *args, **kwargs)
+            etag_parts, last_modified = validators
+            etag = quote_etag(md5(repr((
+                request.user.pk, request.META.get('CSRF_COOKIE'),
+                request.get_full_path(), etag_parts
+            )).encode()).hexdigest())
+            timestamp = int(last_modified.timestamp())
+            if request.user.is_authenticated:
+                # Дата не меняется при смене токена CSRF в формах
+                timestamp = None
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.setdefault('ETag', etag)
+                if timestamp is not None:
+                    response.setdefault(
+                        'Last-Modified', http_date(timestamp)
+                    )
+            return response
+        return wrapper
+    return decorator
+
+
+def _version_time(version):
+    """Дата изменения из версии ленты - метки времени в микросекундах."""
+    return datetime.fromtimestamp(version / 10 ** 6, tz=dt_timezone.utc)
+
+
+def _feed_validators(tag, **filters):
+    """
+    Версия ленты из FeedVersion и дата последнего вышедшего поста:
+    первая меняется при записи постов, комментариев, категорий, мест
+    и авторов, вторая - при выходе отложенного поста. Оба значения
+    читаются по ключу и индексу ленты, без обхода её записей.
+    """
+    version = get_feed_version(tag)
+    latest = FeedEntry.objects.filter(
+        pub_date__lte=timezone.now(), **filters
+    ).order_by('-pub_date').values_list('pub_date', flat=True).first()
+    last_modified = _version_time(version)
+    if latest is not None:
+        last_modified = max(last_modified, latest)
+    return (version, latest), last_modified
+
+
+def index_validator(request):
+    return _feed_validators(FEED_TAG)
+
+
+def category_validator(request, category_slug):
+    category = Category.objects.filter(
+        slug=category_slug, is_published=True
+    ).values_list('pk', 'updated_at').first()
+    if category is None:
+        return None
+    category_id, updated_at = category
+    etag_parts, last_modified = _feed_validators(
+        f'category:{category_id}', category_id=category_id
+    )
+    return (etag_parts, updated_at), max(last_modified, updated_at)
+
+
+def profile_validator(request, username):
+    """Владельцу профиля выводятся все его посты, в том числе не вышедшие."""
+    profile = User.objects.filter(username=username).values_list(
+        'pk', 'first_name', 'last_name'
+    ).first()
+    if profile is None:
+        return None
+    author_id = profile[0]
+    tag = f'author:{author_id}'
+    if author_id == request.user.pk:
+        version = get_feed_version(tag)
+        return (version, profile), _version_time(version)
+    etag_parts, last_modified = _feed_validators(tag, author_id=author_id)
+    return (etag_parts, profile), last_modified
+
+
+def post_validator(request, post_id):
+    """Дата изменения поста, если пост виден пользователю."""
+    post = Post.objects.filter(pk=post_id).values_list(
+        'updated_at', 'author_id', 'is_published', 'pub_date',
+        'category__is_published'
+    ).first()
+    if post is None:
+        return None
+    updated_at, author_id, is_published, pub_date, category_published = post
+    visible = author_id == request.user.pk or (
+        is_published and category_published and pub_date <= timezone.now()
+    )
+    if not visible:
+        return None
+    return updated_at, updated_at
@@ -0,0 +1,171 @@
+import re
+
+# Слово, которое может оказаться именем класса: из атрибута class,
+# условного блока шаблона, строки в Python или JavaScript
+TOKEN_RE = re.compile(r'[A-Za-z0-9_-]+')
+CLASS_ATTRIBUTE_RE = re.compile(r'\bclass="([^"]*)"')
+SELECTOR_CLASS_RE = re.compile(r'\.((?:\\.|[-\w])+)')
+SELECTOR_ID_RE = re.compile(r'#((?:\\.|[-\w])+)')
+# Аргументы :not() и атрибуты не требуют, чтобы класс использовался
+IGNORED_SELECTOR_PARTS_RE = re.compile(r':not\([^)]*\)|\[[^\]]*\]')
+KEYFRAMES_RE = re.compile(r'@(?:-webkit-)?keyframes\s+([-\w]+)')
+# Группирующие at-правила, внутри которых правила фильтруются
+GROUPING_RULES = ('@media', '@supports', '@layer', '@container')
+
+
+def used_tokens(texts):
+    """Все слова текстов: лишнее слово только оставит ненужное правило."""
+    tokens = set()
+    for text in texts:
+        tokens.update(TOKEN_RE.findall(text))
+    return tokens
+
+
+def template_classes(text):
+    """Классы из атрибутов class без вставок шаблонизатора."""
+    classes = set()
+    for value in CLASS_ATTRIBUTE_RE.findall(text):
+        value = re.sub(r'{%.*?%}|{{.*?}}', ' ', value)
+        classes.update(
+            name for name in value.split() if TOKEN_RE.fullmatch(name)
+        )
+    return classes
+
+
+def _skip_string(css, position):
+    quote = css[position]
+    position += 1
+    while position < len(css) and css[position] != quote:
+        position += 2 if css[position] == '\\' else 1
+    return position + 1
+
+
+def _block_end(css, position):
+    """Позиция за закрывающей скобкой блока, открытого перед position."""
+    depth = 1
+    while depth:
+        char = css[position]
+        if char in '"\'':
+            position = _skip_string(css, position)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        position += 1
+    return position
+
+
+def split_rules(css):
+    """
+    Правила верхнего уровня: (заголовок, тело) для блоков и (текст, None)
+    для @charset, @import и комментариев /*! … */ с лицензией.
+    Остальные комментарии отбрасываются.
+    """
+    rules = []
+    start = position = 0
+    while position < len(css):
+        char = css[position]
+        if css.startswith('/*', position):
+            end = css.find('*/', position + 2) + 2
+            if css.startswith('/*!', position):
+                rules.append((css[position:end], None))
+            position = start = end
+        elif char in '"\'':
+            position = _skip_string(css, position)
+        elif char == ';':
+            rules.append((css[start:position + 1].strip(), None))
+            position = start = position + 1
+        elif char == '{':
+            end = _block_end(css, position + 1)
+            rules.append(
+                (css[start:position].strip(), css[position + 1:end - 1])
+            )
+            position = start = end
+        else:
+            position += 1
+    return rules
+
+
+def split_selectors(prelude):
+    """Селекторы списка через запятую без разбиения внутри скобок."""
+    selectors, depth, start = [], 0, 0
+    for position, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and not depth:
+            selectors.append(prelude[start:position].strip())
+            start = position + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def _unescape(name):
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def selector_names(selector):
+    """Классы и id, без которых селектор ничего не выберет."""
+    selector = IGNORED_SELECTOR_PARTS_RE.sub('', selector)
+    return {
+        _unescape(name) for name in
+        SELECTOR_CLASS_RE.findall(selector) + SELECTOR_ID_RE.findall(selector)
+    }
+
+
+def purge(css, tokens):
+    """
+    Оставляет правила, все классы и id которых встречаются в tokens.
+    Селекторы по тегам и атрибутам, :root, @font-face и анимации,
+    на которые ссылаются оставшиеся правила, сохраняются.
+    """
+    output, keyframes = [], []
+    for prelude, body in split_rules(css):
+        if body is None:
+            output.append(prelude)
+        elif prelude.startswith(GROUPING_RULES):
+            inner = purge(body, tokens)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            match = KEYFRAMES_RE.match(prelude)
+            if match:
+                keyframes.append((len(output), match.group(1)))
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if selector_names(selector) <= tokens
+            ]
+            if selectors:
+                output.append(f'{",".join(selectors)}{{{body}}}')
+    keyframes_indexes = {index for index, name in keyframes}
+    rules = ''.join(
+        rule for index, rule in enumerate(output)
+        if index not in keyframes_indexes
+    )
+    for index, name in keyframes:
+        if not re.search(rf'\b{re.escape(name)}\b', rules):
+            output[index] = ''
+    return ''.join(output)
+
+
+def defined_classes(css):
+    """Классы из селекторов всех правил таблицы стилей."""
+    return {
+        _unescape(name) for name in SELECTOR_CLASS_RE.findall(
+            ' '.join(prelude for prelude, body in _all_rules(css))
+        )
+    }
+
+
+def _all_rules(css):
+    for prelude, body in split_rules(css):
+        if body is None:
+            continue
+        if prelude.startswith(GROUPING_RULES):
+            yield from _all_rules(body)
+        elif not prelude.startswith('@'):
+            yield prelude, body
@@ -0,0 +1,114 @@
+from django.db import transaction
+from django.utils.text import Truncator
+
+from .models import FeedEntry, Post
+
+# Количество слов в анонсе поста в ленте
+EXCERPT_WORDS = 10
+# Количество постов, добавляемых в ленту одним запросом
+BATCH_SIZE = 500
+# Поля категории, которые влияют на записи ленты
+CATEGORY_FIELDS = ('is_published', 'slug', 'title')
+
+
+def is_visible(post):
+    """Виден ли пост в лентах без учёта даты публикации."""
+    return (
+        post.is_published
+        and post.category_id is not None
+        and post.category.is_published
+    )
+
+
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS)
+
+
+def get_location_name(location):
+    if location is None or not location.is_published:
+        return ''
+    return location.name
+
+
+def entry_from_post(post):
+    return FeedEntry(
+        post_id=post.pk,
+        pub_date=post.pub_date,
+        title=post.title,
+        excerpt=post.excerpt,
+        image=post.image.name or '',
+        comment_count=post.comment_count,
+        card_version=post.card_version,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        category_id=post.category_id,
+        category_slug=post.category.slug,
+        category_title=post.category.title,
+        location_id=post.location_id,
+        location_name=get_location_name(post.location),
+    )
+
+
+def sync_post(post):
+    """Добавляет, обновляет или удаляет запись ленты для поста."""
+    if not is_visible(post):
+        FeedEntry.objects.filter(pk=post.pk).delete()
+        return
+    entry_from_post(post).save()
+
+
+def fill_entries(posts):
+    """Добавляет в ленту видимые посты из queryset пачками."""
+    posts = posts.filter(
+        is_published=True, category__is_published=True
+    ).select_related(
+        'author', 'category', 'location'
+    ).defer('text').order_by()
+    batch = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        batch.append(entry_from_post(post))
+        if len(batch) == BATCH_SIZE:
+            FeedEntry.objects.bulk_create(batch)
+            batch = []
+    FeedEntry.objects.bulk_create(batch)
+
+
+def category_fields(category):
+    """Значения полей категории, от которых зависят записи ленты."""
+    # Через __dict__, чтобы не подгружать отложенные поля
+    return {name: category.__dict__.get(name) for name in CATEGORY_FIELDS}
+
+
+def sync_category(category, changed_fields):
+    """
+    Обновляет записи ленты постов категории: при смене публикации
+    пересобирает их, при смене слага или названия - обновляет на месте.
+    """
+    if 'is_published' in changed_fields:
+        with transaction.atomic():
+            FeedEntry.objects.filter(category=category).delete()
+            if category.is_published:
+                fill_entries(Post.objects.filter(category=category))
+    elif changed_fields:
+        FeedEntry.objects.filter(category=category).update(
+            category_slug=category.slug, category_title=category.title
+        )
+
+
+def sync_location(location):
+    FeedEntry.objects.filter(location=location).update(
+        location_name=get_location_name(location)
+    )
+
+
+def sync_author(user):
+    FeedEntry.objects.filter(author=user).update(
+        author_username=user.username
+    )
+
+
+@transaction.atomic
+def rebuild():
+    """Полностью пересобирает таблицу ленты."""
+    FeedEntry.objects.all().delete()
+    fill_entries(Post.objects.all())
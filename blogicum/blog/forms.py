@@ -6,7 +6,28 @@ from .models import Comment, Post
 User = get_user_model()
 
 
-class PostForm(forms.ModelForm):
+class UploadErrorsForm(forms.ModelForm):
+    """
+    Форма с файлами: ошибки, найденные ImageUploadHandler при разборе
+    запроса, выводятся у полей. Отклонённого файла нет в request.FILES,
+    и без этого форма сохранилась бы без него.
+    """
+
+    # Ошибки по умолчанию для форм, которые создаёт админка
+    upload_errors = {}
+
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if upload_errors is not None:
+            self.upload_errors = upload_errors
+
+    def clean(self):
+        for field, error in self.upload_errors.items():
+            self.add_error(field if field in self.fields else None, error)
+        return super().clean()
+
+
+class PostForm(UploadErrorsForm):
 
     class Meta:
         model = Post
@@ -0,0 +1,255 @@
+import logging
+import multiprocessing
+import os
+import threading
+from base64 import b64encode
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import OuterRef, Subquery
+from PIL import Image, ImageOps
+
+from . import cards, page_cache
+from .models import Post, StoredImage
+from .storage import HashedMediaStorage
+
+logger = logging.getLogger(__name__)
+
+# Ширины уменьшенных копий: узкие экраны, ширина карточки и страницы
+# поста (40rem), та же ширина для экранов с двойной плотностью
+VARIANT_WIDTHS = (320, 640, 1280)
+# Ширина изображения на странице для атрибута sizes
+SIZES = '(min-width: 40rem) 40rem, 100vw'
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+# Размер и качество заглушки, показываемой до загрузки изображения
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 50
+# Тег EXIF с ориентацией снимка
+EXIF_ORIENTATION = 0x0112
+# Ориентации, при которых ширина и высота меняются местами
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+# Поля StoredImage, которые добавляются постам для шаблонов
+IMAGE_FIELDS = ('variants', 'width', 'height', 'placeholder')
+# Каталог копий рядом с исходным изображением
+VARIANTS_DIRECTORY = 'variants'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_storage():
+    return Post._meta.get_field('image').storage
+
+
+def variant_name(name, width, extension):
+    """blog_images/photo.jpg -> blog_images/variants/photo_640w.webp"""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, VARIANTS_DIRECTORY, f'{stem}_{width}w.{extension}'
+    )
+
+
+def variant_names(name, widths):
+    """Имена всех копий изображения для перечисленных ширин."""
+    extension = fallback_extension(name)
+    for width in widths:
+        yield variant_name(name, width, extension)
+        yield variant_name(name, width, 'webp')
+
+
+def fallback_extension(name):
+    """Копии PNG и GIF сохраняются в PNG, чтобы не потерять прозрачность."""
+    extension = os.path.splitext(name)[1].lower()
+    return 'png' if extension in ('.png', '.gif') else 'jpg'
+
+
+def _save(storage, name, image, image_format, **options):
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    content = ContentFile(buffer.getvalue())
+    if isinstance(storage, HashedMediaStorage):
+        # Копии называются по исходному файлу, а не по своему содержимому
+        storage.write(name, content)
+        return
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, content)
+
+
+def make_variants(name):
+    """
+    Создаёт уменьшенные копии изображения в исходном формате и WebP;
+    возвращает их ширины. Выполняется в процессе пула.
+    """
+    storage = get_storage()
+    with storage.open(name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    extension = fallback_extension(name)
+    if extension == 'png':
+        image = image.convert('RGBA')
+        image_format, options = 'PNG', {'optimize': True}
+    else:
+        image = image.convert('RGB')
+        image_format, options = 'JPEG', {
+            'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True
+        }
+    widths = [width for width in VARIANT_WIDTHS if width < image.width]
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        _save(
+            storage, variant_name(name, width, extension),
+            resized, image_format, **options
+        )
+        _save(
+            storage, variant_name(name, width, 'webp'),
+            resized, 'WEBP', quality=WEBP_QUALITY, method=4
+        )
+    return widths
+
+
+def make_placeholder(image):
+    """Крошечная копия изображения в виде data URI."""
+    thumbnail = ImageOps.exif_transpose(image).convert('RGB')
+    thumbnail.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = BytesIO()
+    thumbnail.save(buffer, format='JPEG', quality=PLACEHOLDER_QUALITY)
+    return 'data:image/jpeg;base64,' + b64encode(buffer.getvalue()).decode()
+
+
+def extract_metadata(name):
+    """
+    Размеры с учётом ориентации, ориентация, размер файла и заглушка.
+    JPEG декодируется сразу в уменьшенном масштабе.
+    """
+    storage = get_storage()
+    with storage.open(name) as file:
+        image = Image.open(file)
+        orientation = image.getexif().get(EXIF_ORIENTATION, 1)
+        width, height = image.size
+        if orientation in ROTATED_ORIENTATIONS:
+            width, height = height, width
+        image.draft('RGB', (PLACEHOLDER_SIZE * 2, PLACEHOLDER_SIZE * 2))
+        placeholder = make_placeholder(image)
+    return {
+        'width': width,
+        'height': height,
+        'orientation': orientation,
+        'size': storage.size(name),
+        'placeholder': placeholder,
+    }
+
+
+def record_metadata(name):
+    StoredImage.objects.update_or_create(
+        name=name, defaults=extract_metadata(name)
+    )
+
+
+def record_variants(name, widths):
+    """Сохраняет ширины копий и обновляет карточки постов с изображением."""
+    StoredImage.objects.update_or_create(
+        name=name, defaults={'variants': ' '.join(map(str, widths))}
+    )
+    refresh_cards(name)
+
+
+def refresh_cards(name):
+    """Сбрасывает карточки и страницы постов с изображением."""
+    cards.bump_card_versions(image=name)
+    page_cache.purge_posts(Post.objects.filter(image=name))
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: рабочие процессы не наследуют соединения с БД
+            # и потоки сервера
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        return _executor
+
+
+def _variants_done(name, future):
+    try:
+        record_variants(name, future.result())
+    except Exception:
+        logger.exception('Не удалось создать копии изображения %s', name)
+    finally:
+        # Обратный вызов выполняется в служебном потоке пула
+        connections.close_all()
+
+
+def schedule_variants(name):
+    """
+    Создаёт копии изображения в пуле процессов после фиксации транзакции
+    или, если IMAGE_VARIANT_WORKERS = 0, сразу.
+    """
+    if not settings.IMAGE_VARIANT_WORKERS:
+        record_variants(name, make_variants(name))
+        return
+
+    def submit():
+        future = get_executor().submit(make_variants, name)
+        future.add_done_callback(partial(_variants_done, name))
+
+    transaction.on_commit(submit)
+
+
+def image_annotations():
+    """
+    Поля StoredImage изображения поста для annotate(): атрибуты
+    image_variants, image_width, image_height, image_placeholder.
+    """
+    stored = StoredImage.objects.filter(name=OuterRef('image'))
+    return {
+        f'image_{field}': Subquery(stored.values(field))
+        for field in IMAGE_FIELDS
+    }
+
+
+def attach_image_info(posts):
+    """Добавляет постам атрибуты из image_annotations() одним запросом."""
+    posts = [
+        post for post in posts
+        if post.image and not hasattr(post, 'image_variants')
+    ]
+    if not posts:
+        return
+    stored = {
+        values[0]: values[1:] for values in StoredImage.objects.filter(
+            name__in={post.image.name for post in posts}
+        ).values_list('name', *IMAGE_FIELDS)
+    }
+    for post in posts:
+        values = stored.get(post.image.name, (None,) * len(IMAGE_FIELDS))
+        for field, value in zip(IMAGE_FIELDS, values):
+            setattr(post, f'image_{field}', value)
+
+
+def srcset(name, widths, extension, original_width=None):
+    """
+    Копии изображения с ширинами для srcset; исходный файл с шириной
+    original_width добавляется последним, чтобы широкие экраны
+    не растягивали самую большую копию.
+    """
+    storage = get_storage()
+    candidates = [
+        f'{storage.url(variant_name(name, width, extension))} {width}w'
+        for width in widths
+    ]
+    if candidates and original_width:
+        candidates.append(f'{storage.url(name)} {original_width}w')
+    return ', '.join(candidates)
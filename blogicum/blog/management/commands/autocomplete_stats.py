@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog import autocomplete
+
+
+class Command(BaseCommand):
+    help = 'Выводит размер индекса подсказок и занимаемую им память.'
+
+    def handle(self, *args, **options):
+        stats = autocomplete.get_index().stats()
+        self.stdout.write(
+            'Записей: {entries} (постов: {posts}, категорий: {categories}, '
+            'пользователей: {users}), память: {memory_bytes} байт, '
+            'номер изменения: {sequence}'.format(**stats)
+        )
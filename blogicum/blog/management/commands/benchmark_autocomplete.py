@@ -0,0 +1,63 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.autocomplete import PrefixIndex, post_key
+
+# Размер словаря синтетических заголовков
+VOCABULARY_SIZE = 50000
+# Количество слов в синтетическом заголовке
+TITLE_WORDS = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время поиска по префиксу в индексе подсказок '
+        'на синтетических заголовках; база данных не используется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles', type=int, default=1_000_000,
+            help='Количество синтетических заголовков.'
+        )
+        parser.add_argument(
+            '--queries', type=int, default=10000,
+            help='Количество запросов.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words = [
+            ''.join(rng.choices('абвгдежзиклмнопрстуфхцчшэюя', k=7))
+            for _ in range(VOCABULARY_SIZE)
+        ]
+        pub_date = timezone.now()
+        started = time.perf_counter()
+        index = PrefixIndex.from_keys(
+            post_key(pk, ' '.join(rng.choices(words, k=TITLE_WORDS)), pub_date)
+            for pk in range(1, options['titles'] + 1)
+        )
+        built = time.perf_counter()
+        timings = []
+        for _ in range(options['queries']):
+            word = rng.choice(words)
+            prefix = word[:rng.randint(2, len(word))]
+            started_query = time.perf_counter()
+            index.search(prefix)
+            timings.append((time.perf_counter() - started_query) * 1000)
+        timings.sort()
+        stats = index.stats()
+        self.stdout.write(
+            f'Заголовков: {stats["entries"]}, построение '
+            f'{built - started:.1f} с, память '
+            f'{stats["memory_bytes"] / 2 ** 20:.1f} МБ'
+        )
+        self.stdout.write(
+            f'Поиск: медиана {statistics.median(timings):.3f} мс, '
+            f'p99 {timings[int(len(timings) * 0.99) - 1]:.3f} мс'
+        )
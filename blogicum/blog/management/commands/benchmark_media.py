@@ -0,0 +1,93 @@
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.views.static import serve
+
+from blog.media import serve_media
+
+# Имя файла в формате HashedMediaStorage
+FILE_NAME = 'blog_images/ab/cd/' + 'abcd' * 16 + '.jpg'
+# Размер запрашиваемого диапазона, байты
+RANGE_SIZE = 64 * 1024
+
+
+def static_serve(request, path, document_root):
+    return serve(request, path, document_root=document_root)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает отдачу загруженных файлов через django.views.static.serve '
+        'и blog.media.serve_media: полный ответ, повторная проверка '
+        'по ETag или дате, диапазон байтов и передача фронтенд-серверу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=5,
+            help='Размер файла, МБ.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Количество запросов в каждом сценарии.'
+        )
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        with tempfile.TemporaryDirectory() as root:
+            full_path = os.path.join(root, FILE_NAME)
+            os.makedirs(os.path.dirname(full_path))
+            with open(full_path, 'wb') as file:
+                file.write(os.urandom(options['size'] * 1024 * 1024))
+            response = serve_media(
+                factory.get('/'), FILE_NAME, document_root=root
+            )
+            response.close()
+            scenarios = [
+                ('полный файл', static_serve, {}),
+                ('полный файл', serve_media, {}),
+                ('повторная проверка', static_serve, {
+                    'HTTP_IF_MODIFIED_SINCE': response['Last-Modified'],
+                }),
+                ('повторная проверка', serve_media, {
+                    'HTTP_IF_NONE_MATCH': response['ETag'],
+                }),
+                ('диапазон 64 КБ', static_serve, {
+                    'HTTP_RANGE': f'bytes=0-{RANGE_SIZE - 1}',
+                }),
+                ('диапазон 64 КБ', serve_media, {
+                    'HTTP_RANGE': f'bytes=0-{RANGE_SIZE - 1}',
+                }),
+            ]
+            for title, view, headers in scenarios:
+                self.report(title, view, factory.get('/', **headers), root,
+                            options['requests'])
+            with override_settings(MEDIA_SERVE_MODE='x-accel-redirect'):
+                self.report('X-Accel-Redirect', serve_media, factory.get('/'),
+                            root, options['requests'])
+        self.stdout.write(
+            'Под сервером с wsgi.file_wrapper (gunicorn, uWSGI) тело '
+            'FileResponse отправляется через os.sendfile без чтения в Python.'
+        )
+
+    def report(self, title, view, request, root, count):
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = view(request, FILE_NAME, document_root=root)
+            body = sum(
+                len(chunk) for chunk in response
+            ) if response.streaming else len(response.content)
+            response.close()
+            timings.append((time.perf_counter() - started) * 1000)
+        name = 'serve_media' if view is serve_media else 'static.serve'
+        self.stdout.write(
+            f'{title:<20} {name:<13} {response.status_code} '
+            f'{body / 1024:>8.0f} КБ  среднее '
+            f'{statistics.mean(timings):.3f} мс'
+        )
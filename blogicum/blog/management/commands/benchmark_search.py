@@ -0,0 +1,131 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.models import Category, Post
+from blog.search import search_posts
+from blog.utils import filter_posts
+
+User = get_user_model()
+
+# Размер словаря синтетических постов
+VOCABULARY_SIZE = 50000
+# Количество слов в заголовке и тексте синтетического поста
+TITLE_WORDS = 6
+TEXT_WORDS = 80
+# Количество постов, добавляемых одним запросом
+BATCH_SIZE = 10000
+# Количество результатов на странице поиска
+LIMIT = 10
+
+
+def like_search(word):
+    """Поиск до FTS5: LIKE по заголовку и тексту видимых постов."""
+    return list(
+        filter_posts(filter_flag=True).defer('text').filter(
+            Q(title__icontains=word) | Q(text__icontains=word)
+        )[:LIMIT]
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск LIKE и search_posts() с FTS5 и BM25 на '
+        'синтетических постах в базе проекта. Запросы выполняются через '
+        'ORM с теми же условиями видимости, что и на странице поиска; '
+        'посты добавляются в транзакции, которая затем откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=100_000,
+            help='Количество синтетических постов.'
+        )
+        parser.add_argument(
+            '--queries', type=int, default=20,
+            help='Количество поисковых запросов каждого вида.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def fill(self, posts, rng):
+        words = [f'слово{i}' for i in range(VOCABULARY_SIZE)]
+        # Частоты слов по закону Ципфа, как в естественном тексте
+        weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+        suffix = uuid.uuid4().hex[:8]
+        author = User.objects.create(username=f'benchmark-{suffix}')
+        category = Category.objects.create(
+            title='Тест поиска', slug=f'benchmark-{suffix}',
+            description='', is_published=True
+        )
+        pub_date = timezone.now() - timedelta(days=1)
+        for start in range(0, posts, BATCH_SIZE):
+            count = min(BATCH_SIZE, posts - start)
+            sample = rng.choices(
+                words, weights, k=count * (TITLE_WORDS + TEXT_WORDS)
+            )
+            batch = []
+            for i in range(count):
+                offset = i * (TITLE_WORDS + TEXT_WORDS)
+                batch.append(Post(
+                    title=' '.join(sample[offset:offset + TITLE_WORDS]),
+                    text=' '.join(sample[
+                        offset + TITLE_WORDS:
+                        offset + TITLE_WORDS + TEXT_WORDS
+                    ]),
+                    pub_date=pub_date,
+                    author=author,
+                    category=category,
+                    is_published=True,
+                ))
+            # Индекс FTS5 заполняют триггеры миграции 0015_post_search
+            Post.objects.bulk_create(batch)
+        return words
+
+    def measure(self, search, queries):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            search(query)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return (
+            statistics.median(timings),
+            timings[int(len(timings) * 0.95) - 1 if len(timings) > 1 else 0],
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Поиск FTS5 поддерживается только SQLite.')
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            started = time.perf_counter()
+            words = self.fill(options['posts'], rng)
+            self.stdout.write(
+                f'Постов: {options["posts"]}, заполнение с индексом FTS5 '
+                f'{time.perf_counter() - started:.1f} с.'
+            )
+            # Редкие, средние и частые слова
+            queries = [
+                rng.choice(words[low:high])
+                for low, high in ((10000, 50000), (500, 5000), (0, 50))
+                for _ in range(options['queries'])
+            ]
+            like = self.measure(like_search, queries)
+            fts = self.measure(
+                lambda word: search_posts(word, per_page=LIMIT), queries
+            )
+            transaction.set_rollback(True)
+        for name, (median, p95) in (
+            ('LIKE', like), ('search_posts (FTS5 + BM25)', fts)
+        ):
+            self.stdout.write(
+                f'{name}: медиана {median:.2f} мс, p95 {p95:.2f} мс'
+            )
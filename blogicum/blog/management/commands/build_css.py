@@ -0,0 +1,105 @@
+import gzip
+from pathlib import Path
+
+import django_bootstrap5
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import css
+
+# Исходная таблица стилей и очищенная от неиспользуемых правил,
+# относительно первого каталога STATICFILES_DIRS
+SOURCE_CSS = 'css/bootstrap.min.css'
+PURGED_CSS = 'css/bootstrap.purged.min.css'
+# Шаблон со встроенными стилями первого экрана
+CRITICAL_CSS_TEMPLATE = 'includes/critical_css.html'
+# Шаблоны, из которых состоит первый экран любой страницы
+ABOVE_THE_FOLD_TEMPLATES = ('base.html', 'includes/header.html')
+
+
+def read_files(directory, patterns):
+    for pattern in patterns:
+        for path in sorted(Path(directory).rglob(pattern)):
+            yield path, path.read_text(encoding='utf-8')
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает из bootstrap.min.css таблицу стилей только с классами, '
+        'которые встречаются в шаблонах проекта и django_bootstrap5, '
+        'и встраиваемые стили первого экрана для base.html.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Не записывать файлы, а завершиться с ошибкой, если они '
+                 'устарели или в шаблонах есть классы без стилей.'
+        )
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        templates_dir = Path(settings.TEMPLATES_DIR)
+        source = (static_dir / SOURCE_CSS).read_text(encoding='utf-8')
+        templates = dict(read_files(templates_dir, ('*.html',)))
+        # Собранные ранее стили не должны влиять на результат
+        templates.pop(templates_dir / CRITICAL_CSS_TEMPLATE, None)
+        # Классы форм и кнопок django_bootstrap5 задаются в его коде
+        # и шаблонах
+        bootstrap5 = dict(read_files(
+            Path(django_bootstrap5.__file__).parent, ('*.py', '*.html')
+        ))
+        purged = css.purge(source, css.used_tokens(
+            list(templates.values()) + list(bootstrap5.values())
+        ))
+        critical = css.purge(purged, css.used_tokens(
+            templates[templates_dir / name]
+            for name in ABOVE_THE_FOLD_TEMPLATES
+        ))
+        # @charset внутри <style> не действует
+        critical = critical.replace('@charset "UTF-8";', '', 1)
+        critical_template = (
+            '{% verbatim %}<style>' + critical + '</style>{% endverbatim %}\n'
+        )
+
+        self.report('Исходная', source)
+        self.report('Очищенная', purged)
+        self.report('Первый экран', critical)
+        defined = css.defined_classes(source)
+        missing = {}
+        for path, text in templates.items():
+            for name in css.template_classes(text) - defined:
+                missing.setdefault(name, []).append(
+                    str(path.relative_to(templates_dir))
+                )
+        for name, paths in sorted(missing.items()):
+            self.stderr.write(
+                f'Класс {name} не описан в {SOURCE_CSS}: {", ".join(paths)}'
+            )
+
+        outputs = {
+            static_dir / PURGED_CSS: purged,
+            templates_dir / CRITICAL_CSS_TEMPLATE: critical_template,
+        }
+        if options['check']:
+            outdated = [
+                str(path) for path, content in outputs.items()
+                if not path.exists()
+                or path.read_text(encoding='utf-8') != content
+            ]
+            if outdated or missing:
+                raise CommandError(
+                    'Устарели: ' + ', '.join(outdated) if outdated
+                    else 'В шаблонах есть классы без стилей.'
+                )
+            return
+        for path, content in outputs.items():
+            path.write_text(content, encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS('Стили собраны.'))
+
+    def report(self, title, content):
+        data = content.encode()
+        self.stdout.write(
+            f'{title:<13} {len(data) / 1024:>7.1f} КБ, gzip '
+            f'{len(gzip.compress(data, compresslevel=9)) / 1024:>6.1f} КБ'
+        )
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.utils import feed_posts, filter_posts
+
+
+def get_feed_querysets():
+    """
+    Запросы лент в том виде, в котором их выполняют представления:
+    (название, queryset, ожидаемый индекс, есть ли условие по pub_date)
+    """
+    now = timezone.now()
+    feeds = (
+        ('index', feed_posts(), 'feed_entry_idx', True),
+        ('category', feed_posts(category_id=1),
+         'feed_entry_category_idx', True),
+        ('profile', feed_posts(author_id=1), 'feed_entry_author_idx', True),
+        ('profile (owner)', filter_posts(
+            model_manager=Post.objects.filter(author_id=1),
+            annotation_flag=True
+        ), 'post_author_feed_idx', False),
+    )
+    cursor_filter = Q(pub_date__lt=now) | Q(pub_date=now, pk__lt=1)
+    for name, queryset, index, has_range in feeds:
+        yield name, queryset, index, has_range
+        yield (
+            f'{name}, cursor', queryset.filter(cursor_filter), index, has_range
+        )
+    comments = Comment.objects.filter(post_id=1).select_related(
+        'author'
+    ).order_by('created_at', 'id')
+    yield 'comments', comments, 'comment_post_created_idx', False
+    yield 'comments, cursor', comments.filter(
+        Q(created_at__gt=now) | Q(created_at=now, pk__gt=1)
+    ), 'comment_post_created_idx', False
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет через EXPLAIN QUERY PLAN, что запросы лент и порций '
+        'комментариев используют индекс и для сортировки, и для диапазона '
+        'по дате публикации.'
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Проверка планов поддерживается только SQLite.')
+        errors = []
+        for name, queryset, index, has_range in get_feed_querysets():
+            plan = queryset[:settings.POSTS_ON_DIPLAY].explain()
+            self.stdout.write(f'{name}:\n{plan}\n')
+            table = queryset.model._meta.db_table
+            post_steps = [
+                line for line in plan.splitlines()
+                if f' {table} ' in f'{line} '
+            ]
+            if not any(f'USING INDEX {index}' in step for step in post_steps):
+                errors.append(f'{name}: не используется индекс {index}')
+            elif has_range and not any(
+                'pub_date<' in step for step in post_steps
+            ):
+                errors.append(f'{name}: индекс не ограничивает pub_date')
+            if 'TEMP B-TREE' in plan:
+                errors.append(f'{name}: сортировка выполняется без индекса')
+        if errors:
+            raise CommandError('\n'.join(errors))
+        self.stdout.write(self.style.SUCCESS('Все ленты используют индексы.'))
@@ -0,0 +1,140 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from blog import images
+from blog.models import Post, StoredImage
+
+# Количество файлов, удаляемых одной пачкой
+DEFAULT_BATCH_SIZE = 500
+# Пауза между пачками, секунды
+DEFAULT_PAUSE = 0.5
+# Файлы моложе этого возраста не удаляются: пост с только что
+# загруженным изображением может быть ещё не сохранён, секунды
+DEFAULT_MIN_AGE = 60 * 60
+
+
+def walk(path, name):
+    """
+    Файлы каталога с именами относительно хранилища в порядке возрастания
+    имени, как при ORDER BY в БД. Каталоги копий пропускаются: копии
+    удаляются вместе с исходным изображением.
+    """
+    try:
+        with os.scandir(path) as iterator:
+            # Каталог сравнивается как «имя/», чтобы «ab.jpg» шёл раньше
+            # «ab/…», как в полных именах
+            entries = sorted(iterator, key=lambda entry: (
+                entry.name + '/' if entry.is_dir(follow_symlinks=False)
+                else entry.name
+            ))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        entry_name = f'{name}/{entry.name}'
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name != images.VARIANTS_DIRECTORY:
+                yield from walk(entry.path, entry_name)
+        elif (
+            entry.is_file(follow_symlinks=False)
+            and not entry.name.startswith('.')
+        ):
+            yield entry_name, entry
+
+
+def referenced_names(directory, chunk_size):
+    """Имена изображений постов в каталоге по возрастанию, из курсора БД."""
+    return Post.objects.filter(
+        image__startswith=f'{directory}/'
+    ).order_by('image').values_list('image', flat=True).distinct().iterator(
+        chunk_size=chunk_size
+    )
+
+
+def find_orphans(files, referenced):
+    """Слияние двух упорядоченных потоков: файлы без ссылок из БД."""
+    referenced = iter(referenced)
+    current = next(referenced, None)
+    for name, entry in files:
+        while current is not None and current < name:
+            current = next(referenced, None)
+        if current != name:
+            yield name, entry
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет изображения постов, на которые не ссылается ни один пост, '
+        'вместе с их копиями. Файлы и имена из БД читаются потоком, '
+        'поэтому память не зависит от количества файлов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество файлов в одной пачке.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=DEFAULT_PAUSE,
+            help='Пауза между пачками в секундах.'
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=DEFAULT_MIN_AGE,
+            help='Не удалять файлы моложе стольких секунд.'
+        )
+
+    def handle(self, *args, **options):
+        storage = images.get_storage()
+        directory = Post._meta.get_field('image').upload_to
+        cutoff = time.time() - options['min_age']
+        orphans = find_orphans(
+            walk(storage.path(directory), directory),
+            referenced_names(directory, options['batch_size'])
+        )
+        self.count = self.size = 0
+        self.verbose = options['verbosity'] > 1 or options['dry_run']
+        batch = []
+        for name, entry in orphans:
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > cutoff:
+                continue
+            batch.append((name, stat.st_size))
+            if len(batch) >= options['batch_size']:
+                self.delete(storage, batch, options['dry_run'])
+                batch = []
+                time.sleep(options['pause'])
+        if batch:
+            self.delete(storage, batch, options['dry_run'])
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов: {self.count}, {filesizeformat(self.size)}.'
+        ))
+
+    def delete(self, storage, batch, dry_run):
+        # Повторная проверка: пока шёл обход, файл мог понадобиться
+        # новому посту с таким же содержимым
+        referenced = set(Post.objects.filter(
+            image__in=[name for name, size in batch]
+        ).values_list('image', flat=True))
+        names = []
+        for name, size in batch:
+            if name in referenced:
+                continue
+            names.append(name)
+            self.count += 1
+            self.size += size
+            if self.verbose:
+                self.stdout.write(name)
+        if dry_run or not names:
+            return
+        for name in names:
+            for variant in images.variant_names(name, images.VARIANT_WIDTHS):
+                storage.delete(variant)
+            storage.delete(name)
+        StoredImage.objects.filter(name__in=names).delete()
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from blog import images
+from blog.models import Post, StoredImage
+
+# Количество имён файлов, выбираемых одним запросом
+DEFAULT_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Извлекает размеры, ориентацию, размер файла и заглушку для '
+        'загруженных изображений постов. Изображения со сведениями '
+        'пропускаются, поэтому прерванный запуск можно продолжить.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество изображений в одной пачке.'
+        )
+        parser.add_argument(
+            '--start-after', default='',
+            help='Имя файла, после которого продолжить обход.'
+        )
+
+    def handle(self, *args, **options):
+        last_name = options['start_after']
+        processed = failed = 0
+        while True:
+            names = list(
+                Post.objects.filter(image__gt=last_name)
+                .order_by('image')
+                .values_list('image', flat=True)
+                .distinct()[:options['batch_size']]
+            )
+            if not names:
+                break
+            done = set(StoredImage.objects.filter(
+                name__in=names, width__isnull=False
+            ).values_list('name', flat=True))
+            for name in names:
+                if name in done:
+                    continue
+                try:
+                    images.record_metadata(name)
+                    images.refresh_cards(name)
+                    processed += 1
+                except (OSError, ValueError) as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+            last_name = names[-1]
+            self.stdout.write(f'Обработано до {last_name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {processed}, с ошибками: {failed}.'
+        ))
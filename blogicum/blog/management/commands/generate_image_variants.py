@@ -0,0 +1,74 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog import images
+from blog.models import Post, StoredImage
+
+# Количество изображений, отправляемых в пул за раз
+DEFAULT_BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии и WebP для уже загруженных изображений '
+        'постов в нескольких процессах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int,
+            default=settings.IMAGE_VARIANT_WORKERS or 1,
+            help='Количество процессов.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество изображений в одной пачке.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии, даже если они уже есть.'
+        )
+
+    def batches(self, batch_size, force):
+        """Имена изображений пачками, по возрастанию имени."""
+        last_name = ''
+        while True:
+            names = Post.objects.filter(image__gt=last_name).exclude(
+                image=''
+            ).order_by('image').values_list(
+                'image', flat=True
+            ).distinct()[:batch_size]
+            names = list(names)
+            if not names:
+                return
+            last_name = names[-1]
+            if not force:
+                # Строка со сведениями создаётся и до появления копий
+                done = set(StoredImage.objects.filter(
+                    name__in=names, variants__isnull=False
+                ).values_list('name', flat=True))
+                names = [name for name in names if name not in done]
+            yield names
+
+    def handle(self, *args, **options):
+        processed = failed = 0
+        # Команда однопоточна, поэтому процессы можно создавать через fork:
+        # они наследуют настройки и не обращаются к БД
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for names in self.batches(options['batch_size'], options['force']):
+                futures = [
+                    (name, pool.submit(images.make_variants, name))
+                    for name in names
+                ]
+                for name, future in futures:
+                    try:
+                        images.record_variants(name, future.result())
+                        processed += 1
+                    except Exception as error:
+                        failed += 1
+                        self.stderr.write(f'{name}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {processed}, с ошибками: {failed}.'
+        ))
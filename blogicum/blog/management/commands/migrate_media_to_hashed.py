@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import images
+from blog.models import FeedEntry, Post, StoredImage
+from blog.storage import HashedMediaStorage
+
+# Количество имён файлов, выбираемых одним запросом
+DEFAULT_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит загруженные ранее изображения постов в хранилище '
+        'с именами по хешу содержимого. Перенесённые файлы пропускаются, '
+        'поэтому прерванный запуск можно продолжить.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество изображений в одной пачке.'
+        )
+
+    def handle(self, *args, **options):
+        storage = images.get_storage()
+        if not isinstance(storage, HashedMediaStorage):
+            self.stderr.write(
+                'Поле изображения не использует HashedMediaStorage.'
+            )
+            return
+        last_name = ''
+        moved = failed = 0
+        while True:
+            names = list(
+                Post.objects.filter(image__gt=last_name)
+                .order_by('image')
+                .values_list('image', flat=True)
+                .distinct()[:options['batch_size']]
+            )
+            if not names:
+                break
+            for name in names:
+                if storage.is_hashed(name):
+                    continue
+                try:
+                    self.migrate(storage, name)
+                    moved += 1
+                except OSError as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+            last_name = names[-1]
+            self.stdout.write(f'Обработано до {last_name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено изображений: {moved}, с ошибками: {failed}.'
+        ))
+
+    def migrate(self, storage, name):
+        with storage.open(name) as file:
+            new_name = storage.save(name, file)
+        stored = StoredImage.objects.filter(name=name).first()
+        with transaction.atomic():
+            Post.objects.filter(image=name).update(image=new_name)
+            FeedEntry.objects.filter(image=name).update(image=new_name)
+            if stored is not None:
+                if StoredImage.objects.filter(name=new_name).exists():
+                    stored.delete()
+                else:
+                    StoredImage.objects.filter(name=name).update(
+                        name=new_name
+                    )
+        if stored is not None:
+            widths = stored.variant_widths
+            for old, new in zip(
+                images.variant_names(name, widths),
+                images.variant_names(new_name, widths),
+            ):
+                if not storage.exists(old):
+                    continue
+                if not storage.exists(new):
+                    with storage.open(old) as file:
+                        storage.write(new, file)
+                storage.delete(old)
+        images.refresh_cards(new_name)
+        storage.delete(name)
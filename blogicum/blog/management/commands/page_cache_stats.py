@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog import page_cache
+
+
+class Command(BaseCommand):
+    help = 'Выводит количество попаданий и промахов кэша страниц.'
+
+    def handle(self, *args, **options):
+        stats = page_cache.stats()
+        self.stdout.write(
+            'Попаданий: {hits}, промахов: {misses}, '
+            'доля попаданий: {hit_ratio:.1%}'.format(**stats)
+        )
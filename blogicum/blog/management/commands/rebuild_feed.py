@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog import feed
+from blog.models import FeedEntry
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает таблицу видимых в лентах постов.'
+
+    def handle(self, *args, **options):
+        feed.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в ленте: {FeedEntry.objects.count()}.'
+        ))
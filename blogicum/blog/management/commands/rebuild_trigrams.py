@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog import trigrams
+from blog.models import TitleTrigram
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает индекс триграмм заголовков постов и категорий.'
+
+    def handle(self, *args, **options):
+        trigrams.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Триграмм в индексе: {TitleTrigram.objects.count()}.'
+        ))
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.cards import set_comment_count
+from blog.models import Comment, FeedEntry, Post
+from blog.page_cache import purge_posts
+
+# Количество постов, пересчитываемых в одной транзакции
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает поле comment_count у публикаций и записей ленты '
+        'пачками и сбрасывает карточки и страницы исправленных постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество публикаций в одной пачке.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            with transaction.atomic():
+                posts = list(
+                    Post.objects.filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .values_list('pk', 'comment_count')[:batch_size]
+                )
+                if not posts:
+                    break
+                last_pk = posts[-1][0]
+                counts = dict(
+                    Comment.objects.filter(
+                        post_id__gte=posts[0][0], post_id__lte=last_pk
+                    ).order_by().values_list('post_id').annotate(Count('pk'))
+                )
+                # Ленты выводят счётчик из FeedEntry
+                feed_counts = dict(
+                    FeedEntry.objects.filter(
+                        pk__gte=posts[0][0], pk__lte=last_pk
+                    ).values_list('pk', 'comment_count')
+                )
+                changed = []
+                for pk, stored in posts:
+                    actual = counts.get(pk, 0)
+                    if stored != actual or feed_counts.get(
+                        pk, actual
+                    ) != actual:
+                        set_comment_count(pk, actual)
+                        changed.append(pk)
+                if changed:
+                    purge_posts(Post.objects.filter(pk__in=changed))
+                fixed += len(changed)
+            checked += len(posts)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}, исправлено: {fixed}.'
+        ))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.markup import render_text
+from blog.models import Comment, Post, RenderedComment, RenderedPost
+
+# Количество записей, обрабатываемых в одной транзакции
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Заполняет сохранённый HTML текстов постов и комментариев пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество записей в одной пачке.'
+        )
+        parser.add_argument(
+            '--missing',
+            action='store_true',
+            help='Обработать только записи без сохранённого HTML.'
+        )
+
+    def render(self, model, rendered_model, batch_size, missing):
+        queryset = model.objects.all()
+        if missing:
+            queryset = queryset.filter(rendered__isnull=True)
+        owner = rendered_model._meta.pk.attname
+        last_pk = 0
+        rendered = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    queryset.filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .values_list('pk', 'text')[:batch_size]
+                )
+                if not rows:
+                    break
+                last_pk = rows[-1][0]
+                pks = [pk for pk, _ in rows]
+                rendered_model.objects.filter(pk__in=pks).delete()
+                rendered_model.objects.bulk_create(
+                    rendered_model(**{owner: pk, 'html': render_text(text)})
+                    for pk, text in rows
+                )
+            rendered += len(rows)
+        return rendered
+
+    def handle(self, *args, **options):
+        for model, rendered_model in (
+            (Post, RenderedPost), (Comment, RenderedComment)
+        ):
+            rendered = self.render(
+                model, rendered_model,
+                options['batch_size'], options['missing']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: обработано {rendered}.'
+            ))
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.warmup import reset_template_cache, warm_up_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время компиляции каждого шаблона с пустым кэшем, как '
+        'в только что запущенном процессе, и повторной загрузки из кэша.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=0,
+            help='Показать только столько самых медленных шаблонов.'
+        )
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write(
+                'При DEBUG кэширующий загрузчик отключён: повторная '
+                'загрузка не быстрее первой.'
+            )
+        reset_template_cache()
+        cold = warm_up_templates()
+        warm = dict(warm_up_templates())
+        cold.sort(key=lambda timing: timing[1], reverse=True)
+        self.stdout.write(f'{"компиляция":>11}  {"из кэша":>9}  шаблон')
+        for name, seconds in cold[:options['limit'] or None]:
+            self.stdout.write(
+                f'{seconds * 1000:8.2f} мс  {warm[name] * 1000:6.3f} мс  '
+                f'{name}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблонов: {len(cold)}, компиляция '
+            f'{sum(seconds for name, seconds in cold) * 1000:.1f} мс, '
+            f'из кэша {sum(warm.values()) * 1000:.1f} мс.'
+        ))
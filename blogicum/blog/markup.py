@@ -0,0 +1,6 @@
+from django.template.defaultfilters import linebreaksbr
+
+
+def render_text(text):
+    """HTML текста поста или комментария: экранирование и переносы строк."""
+    return linebreaksbr(text, autoescape=True)
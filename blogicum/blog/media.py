@@ -0,0 +1,233 @@
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from .storage import HashedMediaStorage
+
+# Содержимое файла с хешем в имени никогда не меняется
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Файлы со старыми именами кэшируются ненадолго и проверяются по ETag
+MUTABLE_CACHE_CONTROL = 'public, max-age=3600'
+# Статика без хеша в имени проверяется при каждом запросе
+STATIC_CACHE_CONTROL = 'public, no-cache'
+# Имя с хешем от ManifestStaticFilesStorage: bootstrap.min.0123456789ab.css
+MANIFEST_HASHED_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+# Один диапазон байтов: bytes=0-99, bytes=100- или bytes=-100
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Размер блока чтения, если сервер отдаёт файл через Python
+BLOCK_SIZE = 64 * 1024
+
+
+class FileRange:
+    """
+    Часть открытого файла для FileResponse. read() не выходит за конец
+    диапазона, а fileno() позволяет серверу с wsgi.file_wrapper отправить
+    Content-Length байт с текущей позиции через os.sendfile.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    (начало, длина) диапазона из заголовка Range или None, если
+    заголовок не задан или не поддерживается; ValueError, если
+    диапазон за пределами файла.
+    """
+    match = RANGE_RE.match(header or '')
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = min(int(last), size)
+        if not length:
+            raise ValueError(header)
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+def if_range_matches(request, etag, last_modified):
+    """Диапазон отдаётся, только если If-Range совпадает с версией файла."""
+    value = request.META.get('HTTP_IF_RANGE')
+    if value is None:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def file_headers(response, etag, last_modified, cache_control):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def stat_file(document_root, path):
+    """Полный путь и os.stat обычного файла внутри document_root."""
+    try:
+        full_path = safe_join(document_root, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Файл не найден.')
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404('Файл не найден.')
+    return full_path, file_stat
+
+
+def offload(full_path, path, content_type):
+    """Пустой ответ, тело которого отдаст фронтенд-сервер."""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SERVE_MODE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        )
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+def send_file(request, full_path, size, content_type, etag, last_modified):
+    """Весь файл или запрошенный в Range диапазон через FileResponse."""
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is not None and not if_range_matches(
+        request, etag, last_modified
+    ):
+        byte_range = None
+    start, length = byte_range or (0, size)
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    else:
+        response = FileResponse(
+            FileRange(open(full_path, 'rb'), start, length),
+            content_type=content_type
+        )
+        response.block_size = BLOCK_SIZE
+    if byte_range is not None:
+        response.status_code = 206
+        response['Content-Range'] = (
+            f'bytes {start}-{start + length - 1}/{size}'
+        )
+    response['Content-Length'] = length
+    return response
+
+
+def serve_file(
+        request, full_path, file_stat, content_type, cache_control,
+        offload_path=None
+):
+    """
+    Ответ с файлом: 304 или 412 по заголовкам условного запроса,
+    затем offload() для offload_path или send_file().
+    """
+    last_modified = int(file_stat.st_mtime)
+    etag = quote_etag(f'{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}')
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if offload_path is not None:
+            response = offload(full_path, offload_path, content_type)
+        else:
+            response = send_file(
+                request, full_path, file_stat.st_size, content_type,
+                etag, last_modified
+            )
+    if response.status_code == 416:
+        return response
+    return file_headers(response, etag, last_modified, cache_control)
+
+
+def guess_type(path):
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+@require_safe
+def serve_media(request, path, document_root=None):
+    """
+    Отдаёт загруженный файл с ETag, Last-Modified, ответами 304,
+    диапазонами байтов и бессрочным кэшированием файлов с хешем
+    в имени. При MEDIA_SERVE_MODE = 'x-accel-redirect' или 'x-sendfile'
+    тело отдаёт фронтенд-сервер, а Django только проверяет запрос.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    full_path, file_stat = stat_file(
+        document_root or settings.MEDIA_ROOT, path
+    )
+    return serve_file(
+        request, full_path, file_stat, guess_type(path),
+        IMMUTABLE_CACHE_CONTROL if HashedMediaStorage.is_hashed(path)
+        else MUTABLE_CACHE_CONTROL,
+        offload_path=(
+            None if settings.MEDIA_SERVE_MODE == 'python' else path
+        )
+    )
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    Отдаёт собранную collectstatic статику из STATIC_ROOT. Файлы с хешем
+    из манифеста кэшируются бессрочно; клиентам, принимающим gzip,
+    отдаётся заранее сжатая копия .gz.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    full_path, file_stat = stat_file(settings.STATIC_ROOT, path)
+    encoding = None
+    if ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        try:
+            full_path, file_stat = stat_file(
+                settings.STATIC_ROOT, path + '.gz'
+            )
+            encoding = 'gzip'
+        except Http404:
+            pass
+    response = serve_file(
+        request, full_path, file_stat, guess_type(path),
+        IMMUTABLE_CACHE_CONTROL if MANIFEST_HASHED_RE.search(path)
+        else STATIC_CACHE_CONTROL
+    )
+    if encoding is not None and response.status_code != 304:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,81 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import Truncator
+
+
+def fill_feed(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    posts = Post.objects.filter(
+        is_published=True, category__is_published=True
+    ).select_related('author', 'category', 'location')
+    FeedEntry.objects.bulk_create((
+        FeedEntry(
+            post_id=post.pk,
+            pub_date=post.pub_date,
+            title=post.title,
+            excerpt=Truncator(post.text).words(10),
+            image=post.image.name or '',
+            comment_count=post.comment_count,
+            author_id=post.author_id,
+            author_username=post.author.username,
+            category_id=post.category_id,
+            category_slug=post.category.slug,
+            category_title=post.category.title,
+            location_id=post.location_id,
+            location_name=(
+                post.location.name
+                if post.location and post.location.is_published else ''
+            ),
+        ) for post in posts.iterator()
+    ), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0008_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='blog.post')),
+                ('pub_date', models.DateTimeField()),
+                ('title', models.CharField(max_length=256)),
+                ('excerpt', models.TextField()),
+                ('image', models.CharField(blank=True, max_length=100)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('author_username', models.CharField(max_length=150)),
+                ('category_slug', models.SlugField()),
+                ('category_title', models.CharField(max_length=256)),
+                ('location_name', models.CharField(blank=True, max_length=256)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.category')),
+                ('location', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.location')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+                'ordering': ('-pub_date', '-post_id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['-pub_date', '-post'], name='feed_entry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['category', '-pub_date', '-post'], name='feed_entry_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['author', '-pub_date', '-post'], name='feed_entry_author_idx'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
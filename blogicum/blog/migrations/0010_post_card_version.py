@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_feed_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedentry',
+            name='card_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='card_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Версия карточки'),
+        ),
+    ]
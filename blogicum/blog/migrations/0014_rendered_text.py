@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedComment',
+            fields=[
+                ('html', models.TextField(verbose_name='HTML текста')),
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rendered', serialize=False, to='blog.comment')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RenderedPost',
+            fields=[
+                ('html', models.TextField(verbose_name='HTML текста')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rendered', serialize=False, to='blog.post')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
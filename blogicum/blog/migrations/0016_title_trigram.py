@@ -0,0 +1,59 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:47
+
+import re
+
+from django.db import migrations, models
+
+# Количество триграмм, записываемых одним запросом
+BATCH_SIZE = 1000
+
+
+def fill_trigrams(apps, schema_editor):
+    TitleTrigram = apps.get_model('blog', 'TitleTrigram')
+    for kind, model_name in (('post', 'Post'), ('category', 'Category')):
+        model = apps.get_model('blog', model_name)
+        batch = []
+        rows = model.objects.order_by().values_list('pk', 'title')
+        for object_id, title in rows.iterator(chunk_size=BATCH_SIZE):
+            trigrams = set()
+            for word in re.findall(r'\w+', title.lower().replace('ё', 'е')):
+                padded = f'  {word} '
+                trigrams.update(
+                    padded[i:i + 3] for i in range(len(padded) - 2)
+                )
+            batch.extend(
+                TitleTrigram(kind=kind, object_id=object_id, trigram=trigram)
+                for trigram in trigrams
+            )
+            if len(batch) >= BATCH_SIZE:
+                TitleTrigram.objects.bulk_create(batch)
+                batch = []
+        TitleTrigram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Публикация'), ('category', 'Категория')], max_length=8)),
+                ('object_id', models.PositiveIntegerField()),
+                ('trigram', models.CharField(max_length=3)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='titletrigram',
+            index=models.Index(fields=['kind', 'trigram', 'object_id'], name='title_trigram_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titletrigram',
+            index=models.Index(fields=['object_id', 'kind'], name='title_trigram_object_idx'),
+        ),
+        migrations.RunPython(fill_trigrams, migrations.RunPython.noop),
+    ]
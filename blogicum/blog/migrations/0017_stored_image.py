@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_title_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('variants', models.CharField(blank=True, max_length=64)),
+            ],
+        ),
+    ]
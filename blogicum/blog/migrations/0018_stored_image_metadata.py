@@ -0,0 +1,38 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_stored_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedimage',
+            name='height',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='storedimage',
+            name='orientation',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='storedimage',
+            name='placeholder',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='storedimage',
+            name='size',
+            field=models.PositiveBigIntegerField(null=True, verbose_name='Размер в байтах'),
+        ),
+        migrations.AddField(
+            model_name='storedimage',
+            name='width',
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:56
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_stored_image_metadata'),
+    ]
+
+    operations = [
+        # Хранилище не влияет на схему, а пересоздание таблицы в SQLite
+        # удалило бы триггеры полнотекстового поиска
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='post',
+                    name='image',
+                    field=models.ImageField(blank=True, storage=blog.storage.HashedMediaStorage(), upload_to='blog_images', verbose_name='Фото'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+def mark_variants_missing(apps, schema_editor):
+    # Пустые ширины могли остаться от строк, созданных до копий
+    StoredImage = apps.get_model('blog', 'StoredImage')
+    StoredImage.objects.filter(variants='').update(variants=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_image_hashed_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='storedimage',
+            name='variants',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(
+            mark_variants_missing, migrations.RunPython.noop
+        ),
+    ]
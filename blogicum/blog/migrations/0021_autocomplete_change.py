@@ -0,0 +1,22 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_stored_image_variants_null'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutocompleteChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(blank=True, max_length=16)),
+                ('object_id', models.BigIntegerField(null=True)),
+                ('key', models.TextField(null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_autocomplete_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedVersion',
+            fields=[
+                ('tag', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField()),
+            ],
+        ),
+    ]
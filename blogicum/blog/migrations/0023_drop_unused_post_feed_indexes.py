@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:46
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_feed_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_feed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_feed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_public_feed_idx',
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.shortcuts import redirect
 
+from .forms import PostForm
 from .models import Comment, Post
 
 
@@ -10,6 +11,16 @@ class PostMixin:
     template_name = 'blog/create.html'
 
 
+class PostFormMixin:
+    form_class = PostForm
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # Ошибки, найденные ImageUploadHandler при разборе запроса
+        kwargs['upload_errors'] = getattr(self.request, 'upload_errors', {})
+        return kwargs
+
+
 class CommentMixin:
     model = Comment
     pk_url_kwarg = 'comment_id'
@@ -18,9 +29,16 @@ class CommentMixin:
 
 class OnlyAuthorMixin(UserPassesTestMixin):
 
+    def get_object(self, queryset=None):
+        # Объект загружается один раз: для проверки автора и для UpdateView
+        # или DeleteView, которые снова вызывают get_object()
+        if not hasattr(self, '_object'):
+            self._object = super().get_object(queryset)
+        return self._object
+
     def test_func(self):
         object = self.get_object()
-        return object.author == self.request.user
+        return object.author_id == self.request.user.pk
 
     def handle_no_permission(self):
         return redirect(
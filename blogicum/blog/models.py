@@ -1,6 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.db.models.query import ModelIterable
 from django.urls import reverse
+from django.utils.safestring import mark_safe
+
+from .markup import render_text
+from .storage import post_image_storage
 
 # Максимальная длина заголовков и названий
 MAX_TITLE_LENGTH = 256
@@ -10,6 +16,17 @@ MAX_STR_LENGTH = 64
 User = get_user_model()
 
 
+def stored_html(instance):
+    """
+    HTML текста из связанной записи rendered; если запись ещё не
+    создана, текст рендерится на лету
+    """
+    try:
+        return mark_safe(instance.rendered.html)
+    except ObjectDoesNotExist:
+        return render_text(instance.text)
+
+
 class BaseModel(models.Model):
     is_published = models.BooleanField(
         default=True,
@@ -19,6 +36,9 @@ class BaseModel(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name='Изменено'
+    )
 
     class Meta:
         abstract = True
@@ -87,17 +107,48 @@ class Post(BaseModel):
         null=True,
         verbose_name='Категория'
     )
-    image = models.ImageField('Фото', upload_to='blog_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='blog_images',
+        storage=post_image_storage,
+        blank=True
+    )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Анонс'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    card_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия карточки'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            # Лента автора, просматриваемая владельцем
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title[:MAX_STR_LENGTH]
 
+    @property
+    def text_html(self):
+        return stored_html(self)
+
 
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
@@ -118,9 +169,264 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            # Покрывает выборку страницы комментариев поста по курсору
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:MAX_STR_LENGTH]
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.post_id})
+
+    @property
+    def text_html(self):
+        return stored_html(self)
+
+
+class RenderedText(models.Model):
+    html = models.TextField('HTML текста')
+
+    class Meta:
+        abstract = True
+
+
+class RenderedPost(RenderedText):
+    """HTML текста поста, вычисляемый при сохранении поста."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rendered',
+    )
+
+
+class RenderedComment(RenderedText):
+    """HTML текста комментария, вычисляемый при сохранении."""
+
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rendered',
+    )
+
+
+def model_from_values(model, db, values):
+    """Экземпляр модели из словаря значений; прочие поля отложены."""
+    field_names = [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in values
+    ]
+    return model.from_db(
+        db, field_names, [values[name] for name in field_names]
+    )
+
+
+class PostCardIterable(ModelIterable):
+    """Выдаёт вместо записей ленты посты, собранные из их полей."""
+
+    def __iter__(self):
+        annotations = list(self.queryset.query.annotation_select)
+        for entry in super().__iter__():
+            post = entry.to_post()
+            for name in annotations:
+                setattr(post, name, getattr(entry, name))
+            yield post
+
+
+class FeedEntryQuerySet(models.QuerySet):
+
+    def as_posts(self):
+        queryset = self._chain()
+        queryset._iterable_class = PostCardIterable
+        return queryset
+
+
+class FeedEntry(models.Model):
+    """
+    Видимый в лентах пост: опубликован и находится в опубликованной
+    категории. Хранит ключ сортировки и поля карточки поста,
+    поддерживается сигналами из blog.feed.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_entry'
+    )
+    pub_date = models.DateTimeField()
+    title = models.CharField(max_length=MAX_TITLE_LENGTH)
+    excerpt = models.TextField()
+    image = models.CharField(max_length=100, blank=True)
+    comment_count = models.PositiveIntegerField(default=0)
+    card_version = models.PositiveBigIntegerField(default=0)
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+'
+    )
+    author_username = models.CharField(max_length=150)
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name='+'
+    )
+    category_slug = models.SlugField()
+    category_title = models.CharField(max_length=MAX_TITLE_LENGTH)
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    # Пустое значение - местоположение не указано или скрыто
+    location_name = models.CharField(max_length=MAX_TITLE_LENGTH, blank=True)
+
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        ordering = ('-pub_date', '-post_id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-post'), name='feed_entry_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-post'),
+                name='feed_entry_category_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-post'),
+                name='feed_entry_author_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.title[:MAX_STR_LENGTH]
+
+    def to_post(self):
+        """Пост с автором, категорией и местоположением без запросов к БД."""
+        db = self._state.db
+        post = model_from_values(Post, db, {
+            'id': self.post_id,
+            'is_published': True,
+            'title': self.title,
+            'pub_date': self.pub_date,
+            'author_id': self.author_id,
+            'location_id': self.location_id,
+            'category_id': self.category_id,
+            'image': self.image,
+            'excerpt': self.excerpt,
+            'comment_count': self.comment_count,
+            'card_version': self.card_version,
+        })
+        post.author = model_from_values(User, db, {
+            'id': self.author_id, 'username': self.author_username
+        })
+        post.category = model_from_values(Category, db, {
+            'id': self.category_id,
+            'is_published': True,
+            'title': self.category_title,
+            'slug': self.category_slug,
+        })
+        if self.location_id is not None:
+            post.location = model_from_values(Location, db, {
+                'id': self.location_id,
+                'is_published': bool(self.location_name),
+                'name': self.location_name,
+            })
+        return post
+
+
+class TitleTrigram(models.Model):
+    """
+    Триграмма заголовка поста или категории для нечёткого поиска,
+    поддерживается сигналами из blog.trigrams.
+    """
+
+    POST = 'post'
+    CATEGORY = 'category'
+    KIND_CHOICES = (
+        (POST, 'Публикация'),
+        (CATEGORY, 'Категория'),
+    )
+
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = (
+            # Подбор кандидатов по триграммам запроса без чтения записей
+            models.Index(
+                fields=('kind', 'trigram', 'object_id'),
+                name='title_trigram_idx',
+            ),
+            models.Index(
+                fields=('object_id', 'kind'),
+                name='title_trigram_object_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.trigram
+
+
+class StoredImage(models.Model):
+    """Сведения о загруженном файле изображения поста."""
+
+    name = models.CharField(max_length=100, primary_key=True)
+    # Ширины созданных уменьшенных копий через пробел;
+    # None - копии ещё не создавались
+    variants = models.CharField(max_length=64, null=True, blank=True)
+    # Размеры с учётом ориентации из EXIF, как на странице
+    width = models.PositiveIntegerField(null=True)
+    height = models.PositiveIntegerField(null=True)
+    # Значение тега Orientation из EXIF, 1 - без поворота
+    orientation = models.PositiveSmallIntegerField(default=1)
+    size = models.PositiveBigIntegerField('Размер в байтах', null=True)
+    # Изображение в несколько пикселей в виде data URI
+    placeholder = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def variant_widths(self):
+        return tuple(int(width) for width in (self.variants or '').split())
+
+
+class AutocompleteChange(models.Model):
+    """
+    Изменение индекса подсказок: процессы сервера применяют к своим
+    индексам изменения с id больше последнего применённого.
+    """
+
+    # Пустой тип - индекс нужно перестроить
+    kind = models.CharField(max_length=16, blank=True)
+    object_id = models.BigIntegerField(null=True)
+    # Строка индекса; None - объект удалён или скрыт
+    key = models.TextField(null=True)
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
+
+
+class FeedVersion(models.Model):
+    """
+    Версия ленты для условных запросов: метка времени последнего
+    изменения, которое меняет страницы ленты. Обновляется вместе
+    со сбросом тегов кэша страниц.
+    """
+
+    # Тег ленты: feed, category:<id> или author:<id>
+    tag = models.CharField(max_length=32, primary_key=True)
+    # Метка времени в микросекундах
+    version = models.PositiveBigIntegerField()
+
+    def __str__(self):
+        return self.tag
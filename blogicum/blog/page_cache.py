@@ -0,0 +1,189 @@
+import time
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .models import FeedVersion
+from .scheduling import feed_cache_timeout
+
+HITS_KEY = 'page_cache:hits'
+MISSES_KEY = 'page_cache:misses'
+# Тег страниц с общей лентой
+FEED_TAG = 'feed'
+# Теги лент категорий и авторов; их версии хранятся в базе
+FEED_TAG_PREFIXES = ('category:', 'author:')
+
+
+def tag_key(tag):
+    return f'page_cache:tag:{tag}'
+
+
+def page_key(request):
+    url = request.build_absolute_uri().encode()
+    return f'page_cache:page:{md5(url).hexdigest()}'
+
+
+def post_tags(post_id, category_id, author_id):
+    """Теги страниц, на которых выводится пост."""
+    return (
+        FEED_TAG,
+        f'post:{post_id}',
+        f'category:{category_id}',
+        f'author:{author_id}',
+    )
+
+
+def is_feed_tag(tag):
+    return tag == FEED_TAG or tag.startswith(FEED_TAG_PREFIXES)
+
+
+def bump_feed_versions(tags, stamp):
+    """Сохраняет в базе новую версию лент для условных запросов."""
+    version = stamp // 1000
+    FeedVersion.objects.filter(tag__in=tags).update(version=version)
+    FeedVersion.objects.bulk_create(
+        [FeedVersion(tag=tag, version=version) for tag in tags],
+        ignore_conflicts=True
+    )
+
+
+def get_feed_version(tag):
+    """Версия ленты из базы, 0 - лента не менялась."""
+    return FeedVersion.objects.filter(tag=tag).values_list(
+        'version', flat=True
+    ).first() or 0
+
+
+def purge(*tags):
+    """
+    Делает недействительными страницы с любым из тегов и меняет версии
+    лент, по которым строятся ETag.
+    """
+    stamp = time.time_ns()
+    tags = set(tags)
+    cache.set_many({tag_key(tag): stamp for tag in tags}, None)
+    feed_tags = [tag for tag in tags if is_feed_tag(tag)]
+    if feed_tags:
+        bump_feed_versions(feed_tags, stamp)
+
+
+def purge_posts(posts):
+    """Сбрасывает страницы, на которых выводятся посты из queryset."""
+    tags = []
+    for values in posts.order_by().values_list(
+        'pk', 'category_id', 'author_id'
+    ).iterator():
+        tags.extend(post_tags(*values))
+    if tags:
+        purge(*tags)
+
+
+def add_cache_tags(request, *tags):
+    """Добавляет теги к странице, которую кэширует cache_anonymous_page."""
+    if hasattr(request, '_page_cache_tags'):
+        request._page_cache_tags.update(tags)
+
+
+def _increment(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def stats():
+    """Количество попаданий и промахов кэша страниц."""
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = values.get(HITS_KEY, 0), values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0,
+    }
+
+
+def get_tag_versions(tags, stamp=None):
+    """Версии тегов; отсутствующим в кэше присваивается stamp."""
+    keys = [tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        stamp = stamp or time.time_ns()
+        for key in missing:
+            cache.add(key, stamp, None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def _get_cached_response(request):
+    entry = cache.get(page_key(request))
+    if entry is None:
+        return None
+    versions, status, content_type, content = entry
+    if cache.get_many(list(versions)) != versions:
+        return None
+    response = HttpResponse(content, status=status, content_type=content_type)
+    response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def cache_anonymous_page(*tags):
+    """
+    Кэширует страницы для анонимных пользователей. Страница помечается
+    тегами tags и добавленными представлением через add_cache_tags;
+    запись с тегом через purge() делает её недействительной. Версии
+    тегов читаются до рендера, и страница не сохраняется, если тег
+    сбросили, пока она рендерилась.
+    Время жизни не превышает времени до выхода отложенного поста.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if (
+                not settings.PAGE_CACHE_ENABLED
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+            ):
+                return view_func(request, *args, **kwargs)
+            response = _get_cached_response(request)
+            if response is not None:
+                _increment(HITS_KEY)
+                return response
+            _increment(MISSES_KEY)
+            request._page_cache_tags = set(tags)
+            started = time.time_ns()
+            versions = get_tag_versions(tags, started)
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+
+            def store(response):
+                dynamic_tags = request._page_cache_tags.difference(tags)
+                dynamic_versions = get_tag_versions(dynamic_tags, started)
+                # Сброс во время рендера: страница может быть устаревшей
+                if any(
+                    version > started
+                    for version in dynamic_versions.values()
+                ) or cache.get_many(list(versions)) != versions:
+                    return
+                versions.update(dynamic_versions)
+                cache.set(page_key(request), (
+                    versions,
+                    response.status_code,
+                    response['Content-Type'],
+                    response.content,
+                ), feed_cache_timeout(settings.PAGE_CACHE_TIMEOUT))
+
+            if getattr(response, 'is_rendered', True):
+                store(response)
+            else:
+                response.add_post_render_callback(store)
+            response['X-Page-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
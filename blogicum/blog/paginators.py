@@ -0,0 +1,284 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Count, Q, Window
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import FeedEntry
+from .scheduling import feed_cache_timeout
+
+# Направления перехода, закодированные в курсоре
+NEXT = 'n'
+PREVIOUS = 'p'
+# Ключ кэша с поколением счётчиков; меняется при изменении категорий
+COUNT_GENERATION_KEY = 'post_count:generation'
+
+
+class CursorPage:
+    """Страница ленты, полученная переходом по курсору."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, paginator):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.paginator = paginator
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Пагинатор по ключу (field, id) без OFFSET и COUNT(*).
+    Стоимость любой страницы равна стоимости первой,
+    порядок стабилен для объектов с одинаковым значением field.
+    По умолчанию - лента постов от новых к старым.
+    """
+
+    def __init__(self, object_list, per_page, field='pub_date',
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.field = field
+        self.descending = descending
+        # Сортировка по столбцу первичного ключа, а не по 'pk', который
+        # у связи OneToOne подставил бы сортировку связанной модели
+        pk_column = object_list.model._meta.pk.attname
+        prefix = '-' if descending else ''
+        self.ordering = (f'{prefix}{field}', f'{prefix}{pk_column}')
+
+    def encode_cursor(self, direction, obj):
+        value = getattr(obj, self.field)
+        raw = f'{direction}|{value.isoformat()}|{obj.pk}'
+        return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Возвращает (направление, значение поля, pk) или None."""
+        try:
+            raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, value, pk = raw.decode().split('|')
+            if direction not in (NEXT, PREVIOUS):
+                return None
+            return direction, datetime.fromisoformat(value), int(pk)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            return None
+
+    def _after(self, value, pk, forward):
+        """Условие для объектов после ключа в направлении обхода."""
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def page(self, cursor=None):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        queryset = self.object_list.order_by(*self.ordering)
+        if decoded is None:
+            objects = list(queryset[:self.per_page + 1])
+            has_more, has_before = len(objects) > self.per_page, False
+            objects = objects[:self.per_page]
+        else:
+            direction, value, pk = decoded
+            if direction == NEXT:
+                objects = list(queryset.filter(
+                    self._after(value, pk, forward=True)
+                )[:self.per_page + 1])
+                has_more, has_before = len(objects) > self.per_page, True
+                objects = objects[:self.per_page]
+            else:
+                objects = list(queryset.reverse().filter(
+                    self._after(value, pk, forward=False)
+                )[:self.per_page + 1])
+                has_more, has_before = True, len(objects) > self.per_page
+                objects = objects[:self.per_page][::-1]
+            if not objects:
+                return self.page()
+        next_cursor = previous_cursor = None
+        if objects and has_more:
+            next_cursor = self.encode_cursor(NEXT, objects[-1])
+        if objects and has_before:
+            previous_cursor = self.encode_cursor(PREVIOUS, objects[0])
+        return CursorPage(objects, next_cursor, previous_cursor, self)
+
+
+def get_count_generation():
+    return cache.get_or_set(COUNT_GENERATION_KEY, 1, None)
+
+
+def make_count_key(feed_key, generation=None):
+    if generation is None:
+        generation = get_count_generation()
+    return 'post_count:{}:{}'.format(
+        generation, ':'.join(str(part) for part in feed_key)
+    )
+
+
+def feed_count_keys(post_values):
+    """Ключи лент, в которые входит пост с данными (category_id, author_id)."""
+    category_id, author_id = post_values
+    return [
+        ('index',),
+        ('category', category_id),
+        ('author', author_id, 'owner'),
+        ('author', author_id, 'public'),
+    ]
+
+
+def invalidate_counts(*feed_keys):
+    """Сбрасывает закэшированное количество постов в указанных лентах."""
+    generation = get_count_generation()
+    cache.delete_many(
+        [make_count_key(feed_key, generation) for feed_key in feed_keys]
+    )
+
+
+def invalidate_all_counts():
+    """Сбрасывает количество постов во всех лентах сменой поколения."""
+    try:
+        cache.incr(COUNT_GENERATION_KEY)
+    except ValueError:
+        cache.set(COUNT_GENERATION_KEY, 1, None)
+
+
+def estimate_row_count(model):
+    """
+    Оценка количества строк в таблице по статистике СУБД
+    (sqlite_stat1 после ANALYZE, pg_class в PostgreSQL) или None
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table]
+            )
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table]
+            )
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+    return None
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Пагинатор с кэшированием количества постов по ключу ленты.
+    При промахе кэша и POSTS_COUNT_WINDOW количество берётся из
+    COUNT(*) OVER() в том же запросе, что и страница.
+    approximate=True разрешает оценивать количество постов общей ленты
+    по статистике СУБД, если в FeedEntry не меньше
+    POSTS_COUNT_APPROXIMATE_AFTER строк.
+    """
+
+    def __init__(self, object_list, per_page, count_key=None,
+                 approximate=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = make_count_key(count_key) if count_key else None
+        self.approximate = approximate
+        self.is_approximate = False
+
+    @cached_property
+    def count(self):
+        if self.cache_key:
+            count = cache.get(self.cache_key)
+            if count is not None:
+                return count
+        count = self._estimate_count()
+        if count is None:
+            count = super().count
+        self._store_count(count)
+        return count
+
+    def _estimate_count(self):
+        """
+        Оценка количества вышедших постов ленты: строки FeedEntry по
+        статистике СУБД без отложенных постов, которые считаются по
+        индексу pub_date. Для других выборок оценка не используется.
+        """
+        threshold = settings.POSTS_COUNT_APPROXIMATE_AFTER
+        if (
+            not self.approximate or threshold is None
+            or self.object_list.model is not FeedEntry
+        ):
+            return None
+        estimate = estimate_row_count(FeedEntry)
+        if estimate is None or estimate < threshold:
+            return None
+        scheduled = FeedEntry.objects.filter(
+            pub_date__gt=timezone.now()
+        ).count()
+        self.is_approximate = True
+        return max(estimate - scheduled, 0)
+
+    def _store_count(self, count):
+        self.__dict__['count'] = count
+        if self.cache_key:
+            cache.set(
+                self.cache_key,
+                count,
+                feed_cache_timeout(settings.POSTS_COUNT_CACHE_TIMEOUT)
+            )
+
+    def _window_page(self, number):
+        """Страница и общее количество одним запросом или None."""
+        if not settings.POSTS_COUNT_WINDOW or 'count' in self.__dict__:
+            return None
+        if self.cache_key and cache.get(self.cache_key) is not None:
+            return None
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return None
+        if number < 1:
+            return None
+        bottom = (number - 1) * self.per_page
+        object_list = list(
+            self.object_list.annotate(
+                window_count=Window(Count('pk'))
+            )[bottom:bottom + self.per_page]
+        )
+        if not object_list:
+            return None
+        self._store_count(object_list[0].window_count)
+        return self._get_page(object_list, number, self)
+
+    def page(self, number):
+        return self._window_page(number) or super().page(number)
+
+    def get_page(self, number):
+        return self._window_page(number) or super().get_page(number)
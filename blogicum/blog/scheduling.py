@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Post
+
+# Ключ кэша с датой ближайшей отложенной публикации
+NEXT_PUBLICATION_KEY = 'scheduling:next_publication'
+# Значение в кэше, означающее отсутствие отложенных публикаций
+NOTHING_SCHEDULED = 'nothing'
+
+
+def get_next_publication(now=None):
+    """
+    Дата ближайшей отложенной публикации или None.
+    Значение хранится в кэше до записи постов или категорий
+    и пересчитывается, когда запланированный пост вышел в ленту.
+    """
+    now = now or timezone.now()
+    next_publication = cache.get(NEXT_PUBLICATION_KEY)
+    if next_publication == NOTHING_SCHEDULED:
+        return None
+    if next_publication is not None and next_publication > now:
+        return next_publication
+    next_publication = Post.objects.filter(
+        is_published=True, pub_date__gt=now
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    cache.set(
+        NEXT_PUBLICATION_KEY, next_publication or NOTHING_SCHEDULED, None
+    )
+    return next_publication
+
+
+def reset_schedule():
+    """
+    Пересчитывает дату ближайшей публикации при записи постов, чтобы
+    чтение лент не обращалось за ней к базе.
+    """
+    cache.delete(NEXT_PUBLICATION_KEY)
+    get_next_publication()
+
+
+def feed_valid_until(now=None):
+    """
+    Момент, до которого видимое содержимое лент не изменится само
+    по себе (без записи в базу), или None, если отложенных постов нет.
+    """
+    return get_next_publication(now)
+
+
+def feed_cache_timeout(timeout, now=None):
+    """
+    Время жизни кэша ленты в секундах: не больше timeout
+    и не дольше выхода ближайшей отложенной публикации.
+    """
+    now = now or timezone.now()
+    valid_until = feed_valid_until(now)
+    if valid_until is None:
+        return timeout
+    seconds = max(int((valid_until - now).total_seconds()), 1)
+    return seconds if timeout is None else min(seconds, timeout)
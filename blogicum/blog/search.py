@@ -0,0 +1,155 @@
+import binascii
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .paginators import CursorPage
+from .utils import filter_posts
+
+# Виртуальная таблица FTS5 над title и text таблицы blog_post,
+# поддерживается триггерами из миграции 0015_post_search
+SEARCH_TABLE = 'blog_post_search'
+# Веса столбцов title и text в ранжировании BM25
+RANK_SQL = f'bm25({SEARCH_TABLE}, 10.0, 1.0)'
+# Маркеры найденных слов во фрагменте; заменяются на <mark>
+# после экранирования текста поста
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_SQL = (
+    f"snippet({SEARCH_TABLE}, 1, '{MARK_START}', '{MARK_END}', '…', 16)"
+)
+WORD_RE = re.compile(r'\w+')
+# Триггеры, которые поддерживают индекс FTS5 в актуальном состоянии.
+# SQLite удаляет их без ошибок, когда миграция пересоздаёт blog_post
+SEARCH_TRIGGERS = {
+    'blog_post_search_insert': '''
+        AFTER INSERT ON blog_post BEGIN
+            INSERT INTO blog_post_search(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    ''',
+    'blog_post_search_delete': '''
+        AFTER DELETE ON blog_post BEGIN
+            INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+        END
+    ''',
+    'blog_post_search_update': '''
+        AFTER UPDATE OF title, text ON blog_post BEGIN
+            INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+            INSERT INTO blog_post_search(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    ''',
+}
+
+
+def restore_search_triggers(connection):
+    """
+    Создаёт недостающие триггеры индекса и перестраивает индекс, если
+    их не было: записи постов без триггеров в него не попали.
+    Возвращает имена восстановленных триггеров.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+            " AND name = %s", [SEARCH_TABLE]
+        )
+        if cursor.fetchone() is None:
+            return []
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            " AND tbl_name = 'blog_post'"
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {name} {SEARCH_TRIGGERS[name]}'
+            )
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE})"
+                " VALUES ('rebuild')"
+            )
+    return missing
+
+
+def make_match_query(query):
+    """
+    Запрос MATCH из слов строки поиска: слова берутся в кавычки, чтобы
+    синтаксис FTS5 в пользовательском вводе не приводил к ошибкам;
+    последнее слово ищется как префикс
+    """
+    words = WORD_RE.findall(query)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+
+def encode_cursor(post):
+    raw = f'{post.rank!r}|{post.pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Возвращает (rank, pk) или None."""
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        rank, pk = raw.decode().split('|')
+        return float(rank), int(pk)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        return None
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def search_posts(query, cursor=None, per_page=None):
+    """
+    Страница видимых постов, найденных по заголовку и тексту, в порядке
+    релевантности BM25; курсор - (rank, id) последнего поста страницы.
+    У постов есть атрибуты rank и snippet с подсвеченными словами.
+    """
+    per_page = per_page or settings.POSTS_ON_DIPLAY
+    match = make_match_query(query)
+    if match is None:
+        return CursorPage([], None, None, None)
+    where = [
+        f'{SEARCH_TABLE}.rowid = blog_post.id',
+        f'{SEARCH_TABLE} MATCH %s',
+    ]
+    params = [match]
+    decoded = decode_cursor(cursor) if cursor else None
+    if decoded is not None:
+        rank, pk = decoded
+        where.append(
+            f'({RANK_SQL} > %s OR ({RANK_SQL} = %s AND blog_post.id > %s))'
+        )
+        params.extend((rank, rank, pk))
+    posts = list(
+        filter_posts(filter_flag=True).defer('text').extra(
+            select={'rank': RANK_SQL, 'snippet': SNIPPET_SQL},
+            tables=[SEARCH_TABLE],
+            where=where,
+            params=params,
+        ).order_by('rank', 'pk')[:per_page + 1]
+    )
+    next_cursor = None
+    if len(posts) > per_page:
+        posts = posts[:per_page]
+        next_cursor = encode_cursor(posts[-1])
+    for post in posts:
+        post.snippet = highlight(post.snippet)
+    return CursorPage(posts, next_cursor, None, None)
@@ -0,0 +1,292 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_migrate, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import autocomplete, feed, images, page_cache, search, trigrams
+from .cards import bump_card_versions, new_card_version, set_comment_count
+from .markup import render_text
+from .models import (
+    Category, Comment, FeedEntry, Location, Post, RenderedComment,
+    RenderedPost, StoredImage, TitleTrigram
+)
+from .paginators import (
+    feed_count_keys, invalidate_all_counts, invalidate_counts
+)
+from .scheduling import reset_schedule
+
+logger = logging.getLogger(__name__)
+
+
+def change_comment_count(post_id, delta):
+    """Атомарно изменяет счётчик комментариев поста на delta."""
+    if post_id is None:
+        return
+    set_comment_count(post_id, F('comment_count') + delta)
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    # Через __dict__, чтобы не подгружать отложенные поля
+    instance._loaded_post_id = instance.__dict__.get('post_id')
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    page_cache.purge_posts(Post.objects.filter(
+        pk__in=(instance._loaded_post_id, instance.post_id)
+    ))
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif instance._loaded_post_id != instance.post_id:
+        change_comment_count(instance._loaded_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+    else:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now()
+        )
+    instance._loaded_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    page_cache.purge_posts(Post.objects.filter(pk=instance.post_id))
+    change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_feeds(sender, instance, **kwargs):
+    instance._loaded_feeds = (
+        instance.__dict__.get('category_id'),
+        instance.__dict__.get('author_id')
+    )
+
+
+@receiver(pre_save, sender=Post)
+def bump_post_card(sender, instance, **kwargs):
+    instance.card_version = new_card_version()
+    # Анонс пересчитывается, только если текст загружен
+    if 'text' in instance.__dict__:
+        instance.excerpt = feed.make_excerpt(instance.text)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    current_feeds = (instance.category_id, instance.author_id)
+    keys = feed_count_keys(current_feeds)
+    tags = page_cache.post_tags(instance.pk, *current_feeds)
+    if instance._loaded_feeds != current_feeds:
+        keys += feed_count_keys(instance._loaded_feeds)
+        tags += page_cache.post_tags(instance.pk, *instance._loaded_feeds)
+    invalidate_counts(*keys)
+    page_cache.purge(*tags)
+    reset_schedule()
+    feed.sync_post(instance)
+    instance._loaded_feeds = current_feeds
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    invalidate_counts(*feed_count_keys(instance._loaded_feeds))
+    page_cache.purge(
+        *page_cache.post_tags(instance.pk, *instance._loaded_feeds)
+    )
+    reset_schedule()
+
+
+@receiver(post_init, sender=Category)
+def remember_category_fields(sender, instance, **kwargs):
+    instance._loaded_feed_fields = feed.category_fields(instance)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    fields = feed.category_fields(instance)
+    changed = {
+        name for name, value in fields.items()
+        if value != instance._loaded_feed_fields[name]
+    }
+    instance._loaded_feed_fields = fields
+    # Описание выводится только на странице категории
+    page_cache.purge(f'category:{instance.pk}')
+    if not changed:
+        return
+    invalidate_all_counts()
+    bump_card_versions(category=instance)
+    feed.sync_category(instance, changed)
+    page_cache.purge(page_cache.FEED_TAG)
+    page_cache.purge_posts(Post.objects.filter(category=instance))
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting(sender, instance, **kwargs):
+    page_cache.purge(page_cache.FEED_TAG, f'category:{instance.pk}')
+    page_cache.purge_posts(Post.objects.filter(category=instance))
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, **kwargs):
+    invalidate_all_counts()
+
+
+@receiver(post_save, sender=Location)
+def location_saved(sender, instance, **kwargs):
+    bump_card_versions(location=instance)
+    feed.sync_location(instance)
+    page_cache.purge_posts(Post.objects.filter(location=instance))
+
+
+@receiver(pre_delete, sender=Location)
+def location_deleted(sender, instance, **kwargs):
+    bump_card_versions(location=instance)
+    page_cache.purge_posts(Post.objects.filter(location=instance))
+    FeedEntry.objects.filter(location=instance).update(location_name='')
+
+
+@receiver(post_save, sender=get_user_model())
+def user_saved(sender, instance, update_fields, **kwargs):
+    if update_fields is None or 'username' in update_fields:
+        bump_card_versions(author=instance)
+        feed.sync_author(instance)
+        page_cache.purge(f'author:{instance.pk}')
+        page_cache.purge_posts(Post.objects.filter(author=instance))
+        commented_posts = Post.objects.filter(
+            comments__author=instance
+        ).distinct()
+        page_cache.purge_posts(commented_posts)
+        Post.objects.filter(pk__in=commented_posts.values('pk')).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=Post)
+def render_post_text(sender, instance, created, **kwargs):
+    if 'text' in instance.__dict__:
+        RenderedPost(
+            post=instance, html=render_text(instance.text)
+        ).save(force_insert=created)
+
+
+@receiver(post_save, sender=Comment)
+def render_comment_text(sender, instance, created, **kwargs):
+    RenderedComment(
+        comment=instance, html=render_text(instance.text)
+    ).save(force_insert=created)
+
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=Category)
+def remember_title(sender, instance, **kwargs):
+    instance._loaded_title = instance.__dict__.get('title')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+def index_title(sender, instance, created, **kwargs):
+    title = instance.__dict__.get('title')
+    if title is None or (not created and title == instance._loaded_title):
+        return
+    kind = TitleTrigram.POST if sender is Post else TitleTrigram.CATEGORY
+    trigrams.index_title(kind, instance.pk, title)
+    instance._loaded_title = title
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Category)
+def remove_title(sender, instance, **kwargs):
+    kind = TitleTrigram.POST if sender is Post else TitleTrigram.CATEGORY
+    trigrams.remove_title(kind, instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def autocomplete_post_saved(sender, instance, **kwargs):
+    key = None
+    if feed.is_visible(instance):
+        key = autocomplete.post_key(
+            instance.pk, instance.title, instance.pub_date
+        )
+    autocomplete.publish(autocomplete.POST, instance.pk, key)
+
+
+@receiver(post_delete, sender=Post)
+def autocomplete_post_deleted(sender, instance, **kwargs):
+    autocomplete.publish(autocomplete.POST, instance.pk)
+
+
+@receiver(post_init, sender=Category)
+def remember_category_published(sender, instance, **kwargs):
+    instance._loaded_is_published = instance.__dict__.get('is_published')
+
+
+@receiver(post_save, sender=Category)
+def autocomplete_category_saved(sender, instance, created, **kwargs):
+    if not created and instance._loaded_is_published != instance.is_published:
+        # Изменилась видимость всех постов категории
+        autocomplete.reset()
+    else:
+        key = None
+        if instance.is_published:
+            key = autocomplete.category_key(instance)
+        autocomplete.publish(autocomplete.CATEGORY, instance.pk, key)
+    instance._loaded_is_published = instance.is_published
+
+
+@receiver(post_delete, sender=Category)
+def autocomplete_category_deleted(sender, **kwargs):
+    autocomplete.reset()
+
+
+@receiver(post_save, sender=get_user_model())
+def autocomplete_user_saved(sender, instance, update_fields, **kwargs):
+    if update_fields is None or {'username', 'is_active'} & set(update_fields):
+        key = autocomplete.user_key(instance) if instance.is_active else None
+        autocomplete.publish(autocomplete.USER, instance.pk, key)
+
+
+@receiver(post_delete, sender=get_user_model())
+def autocomplete_user_deleted(sender, instance, **kwargs):
+    autocomplete.publish(autocomplete.USER, instance.pk)
+
+
+def get_image_name(post):
+    image = post.__dict__.get('image')
+    return getattr(image, 'name', image) or None
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._loaded_image = get_image_name(instance)
+
+
+@receiver(post_save, sender=Post)
+def image_saved(sender, instance, **kwargs):
+    name = get_image_name(instance)
+    if name is None or name == instance._loaded_image:
+        return
+    instance._loaded_image = name
+    width, variants = StoredImage.objects.filter(name=name).values_list(
+        'width', 'variants'
+    ).first() or (None, None)
+    if width is None:
+        images.record_metadata(name)
+    # Копии могли не создаться, если задача пула завершилась с ошибкой
+    if variants is None:
+        images.schedule_variants(name)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name != 'blog':
+        return
+    restored = search.restore_search_triggers(connections[using])
+    if restored:
+        logger.warning(
+            'Восстановлены триггеры поиска %s, индекс перестроен',
+            ', '.join(restored)
+        )
@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Количество уровней вложенных каталогов и длина имени каждого
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+HASHED_NAME_RE = re.compile(
+    r'(?:^|/)' + r'[0-9a-f]{%d}/' % SHARD_WIDTH * SHARD_LEVELS
+    + r'[0-9a-f]{64}(?:\.\w+)?$'
+)
+# Статика, для которой collectstatic сохраняет сжатую копию .gz
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.json', '.txt', '.html', '.xml'
+)
+
+
+@deconstructible
+class HashedMediaStorage(FileSystemStorage):
+    """
+    Хранит файлы под именем из SHA-256 содержимого в каталогах по первым
+    символам хеша: blog_images/ab/cd/abcd….jpg. Одинаковые файлы
+    хранятся один раз, а содержимое файла по имени никогда не меняется.
+    """
+
+    @staticmethod
+    def is_hashed(name):
+        return HASHED_NAME_RE.search(name) is not None
+
+    @staticmethod
+    def hashed_name(name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        shards = [
+            digest[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH]
+            for level in range(SHARD_LEVELS)
+        ]
+        extension = os.path.splitext(name)[1].lower()
+        return '/'.join(
+            [os.path.dirname(name), *shards, digest + extension]
+        ).lstrip('/')
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым: файл с тем же именем совпадает
+        return name
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if not self.exists(name):
+            self.write(name, content)
+        return name
+
+    def write(self, name, content):
+        """
+        Записывает файл под заданным именем через временный файл
+        и атомарную замену: параллельная запись того же файла безопасна.
+        """
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0)
+            try:
+                os.makedirs(
+                    directory, self.directory_permissions_mode, exist_ok=True
+                )
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=directory, prefix='.upload-'
+        )
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            os.chmod(
+                temporary_path, self.file_permissions_mode or 0o644
+            )
+            os.replace(temporary_path, full_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        return name
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хешем содержимого в имени и копиями .gz текстовых файлов,
+    которые collectstatic создаёт один раз. Пока collectstatic
+    не запускался, {% static %} отдаёт исходные имена.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Файла нет в STATIC_ROOT
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        yield from super().post_process(paths, dry_run, **options)
+        # Сжимаются исходные и окончательные имена с хешем из манифеста
+        for name in set(paths).union(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        compressed_name = name + '.gz'
+        if self.exists(compressed_name):
+            self.delete(compressed_name)
+        if len(compressed) < len(content):
+            self._save(compressed_name, ContentFile(compressed))
+
+
+post_image_storage = HashedMediaStorage()
@@ -0,0 +1,32 @@
+from django import template
+
+from blog.images import (
+    SIZES, attach_image_info, fallback_extension, srcset
+)
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, lazy=True):
+    """
+    Изображение поста с уменьшенными копиями в srcset, размерами
+    и заглушкой; хранилище файлов не используется.
+    """
+    attach_image_info([post])
+    name = post.image.name
+    widths = [int(width) for width in (post.image_variants or '').split()]
+    return {
+        'post': post,
+        'lazy': lazy,
+        'sizes': SIZES,
+        'srcset': srcset(
+            name, widths, fallback_extension(name), post.image_width
+        ),
+        # Исходного файла в WebP нет, и в источнике WebP последним
+        # кандидатом идёт он же: браузер с WebP декодирует и его формат
+        'webp_srcset': srcset(name, widths, 'webp', post.image_width),
+        'width': post.image_width,
+        'height': post.image_height,
+        'placeholder': post.image_placeholder,
+    }
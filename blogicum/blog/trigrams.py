@@ -0,0 +1,116 @@
+import re
+
+from django.db.models import Count
+
+from .models import Category, Post, TitleTrigram
+from .utils import filter_posts
+
+WORD_RE = re.compile(r'\w+')
+# Минимальное сходство заголовка с запросом, как в pg_trgm
+SIMILARITY_THRESHOLD = 0.3
+# Количество кандидатов с наибольшим числом общих триграмм
+CANDIDATES = 100
+# Количество триграмм, добавляемых одним запросом
+BATCH_SIZE = 1000
+
+
+def make_trigrams(text):
+    """
+    Триграммы слов текста: слово дополняется двумя пробелами слева
+    и одним справа, как в pg_trgm; регистр и ё не различаются
+    """
+    trigrams = set()
+    for word in WORD_RE.findall(text.lower().replace('ё', 'е')):
+        padded = f'  {word} '
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def index_title(kind, object_id, title):
+    TitleTrigram.objects.filter(kind=kind, object_id=object_id).delete()
+    TitleTrigram.objects.bulk_create(
+        TitleTrigram(kind=kind, object_id=object_id, trigram=trigram)
+        for trigram in make_trigrams(title)
+    )
+
+
+def remove_title(kind, object_id):
+    TitleTrigram.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def find_similar(kind, query, threshold=SIMILARITY_THRESHOLD):
+    """
+    [(id, сходство)] объектов с похожими заголовками по убыванию сходства.
+    Сходство - доля общих триграмм (коэффициент Жаккара); оба запроса
+    читают только индекс триграмм.
+    """
+    trigrams = make_trigrams(query)
+    if not trigrams:
+        return []
+    index = TitleTrigram.objects.filter(kind=kind)
+    shared = dict(
+        index.filter(trigram__in=trigrams)
+        .values_list('object_id')
+        .annotate(shared=Count('object_id'))
+        .order_by('-shared')[:CANDIDATES]
+    )
+    totals = dict(
+        index.filter(object_id__in=shared)
+        .values_list('object_id')
+        .annotate(Count('object_id'))
+        .order_by()
+    )
+    scores = []
+    for object_id, count in shared.items():
+        similarity = count / (len(trigrams) + totals[object_id] - count)
+        if similarity >= threshold:
+            scores.append((object_id, similarity))
+    scores.sort(key=lambda item: (-item[1], item[0]))
+    return scores
+
+
+def _ordered(scores, queryset, limit):
+    objects = queryset.in_bulk([object_id for object_id, _ in scores])
+    result = []
+    for object_id, similarity in scores:
+        if object_id in objects:
+            objects[object_id].similarity = similarity
+            result.append(objects[object_id])
+    return result[:limit]
+
+
+def similar_posts(query, limit=10):
+    """Видимые посты с похожими заголовками."""
+    return _ordered(
+        find_similar(TitleTrigram.POST, query),
+        filter_posts(filter_flag=True).defer('text'),
+        limit,
+    )
+
+
+def similar_categories(query, limit=5):
+    """Опубликованные категории с похожими названиями."""
+    return _ordered(
+        find_similar(TitleTrigram.CATEGORY, query),
+        Category.objects.filter(is_published=True),
+        limit,
+    )
+
+
+def rebuild():
+    """Заново строит индекс триграмм по всем постам и категориям."""
+    TitleTrigram.objects.all().delete()
+    for kind, model in (
+        (TitleTrigram.POST, Post), (TitleTrigram.CATEGORY, Category)
+    ):
+        batch = []
+        rows = model.objects.order_by().values_list('pk', 'title')
+        for object_id, title in rows.iterator():
+            batch.extend(
+                TitleTrigram(kind=kind, object_id=object_id, trigram=trigram)
+                for trigram in make_trigrams(title)
+            )
+            if len(batch) >= BATCH_SIZE:
+                TitleTrigram.objects.bulk_create(batch)
+                batch = []
+        TitleTrigram.objects.bulk_create(batch)
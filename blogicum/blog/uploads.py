@@ -0,0 +1,145 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    StopUpload, TemporaryFileUploadHandler
+)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+# Начальные байты допустимых форматов
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+    (b'RIFF', 'WEBP'),
+)
+# Форматы Pillow, которыми может открыться файл с сигнатурой: снимки
+# с несколькими кадрами (MPF) начинаются как JPEG, но открываются как MPO
+OPENED_FORMATS = {
+    'JPEG': ('JPEG', 'MPO'),
+}
+# Сколько байт начала файла можно прочитать, чтобы узнать размеры
+# изображения: в JPEG перед ними могут идти EXIF и миниатюра
+HEADER_LIMIT = 256 * 1024
+
+
+def sniff_format(header):
+    """Формат изображения по начальным байтам или None."""
+    for signature, image_format in SIGNATURES:
+        if header.startswith(signature):
+            if image_format == 'WEBP' and header[8:12] != b'WEBP':
+                return None
+            return image_format
+    return None
+
+
+def read_size(file):
+    """
+    Формат и размеры изображения по заголовку или None, если заголовок
+    прочитан не полностью. Пиксели не декодируются.
+    """
+    try:
+        with Image.open(file) as image:
+            return image.format, image.size
+    except (OSError, SyntaxError, EOFError, ValueError):
+        return None
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загружаемые файлы во временный файл на диске и прерывает
+    загрузку, как только файл превысил MAX_IMAGE_UPLOAD_SIZE, оказался
+    не JPEG, PNG, GIF или WebP или больше MAX_IMAGE_PIXELS пикселей.
+    Остаток запроса не читается, а ошибка сохраняется
+    в request.upload_errors для формы.
+    """
+
+    def handle_raw_input(
+            self, input_data, meta, content_length, boundary, encoding=None
+    ):
+        self.request_length = content_length
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.header = b''
+        self.image_format = None
+        self.checked = False
+        # Остальные поля не больше DATA_UPLOAD_MAX_MEMORY_SIZE, поэтому
+        # слишком большой файл видно по длине запроса
+        if self.content_length is not None:
+            file_length = self.content_length
+        elif settings.DATA_UPLOAD_MAX_MEMORY_SIZE is not None:
+            file_length = (
+                self.request_length - settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+            )
+        else:
+            file_length = 0
+        if file_length > settings.MAX_IMAGE_UPLOAD_SIZE:
+            self.reject_size()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.MAX_IMAGE_UPLOAD_SIZE:
+            self.reject_size()
+        if not self.checked and len(self.header) < HEADER_LIMIT:
+            self.header += raw_data[:HEADER_LIMIT - len(self.header)]
+            self.check_header()
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_header(self):
+        if self.image_format is None:
+            self.image_format = sniff_format(self.header)
+            if self.image_format is None and len(self.header) >= 12:
+                self.reject_format()
+        if self.image_format is not None:
+            self.check_image(BytesIO(self.header))
+
+    def check_image(self, file):
+        try:
+            result = read_size(file)
+        except Image.DecompressionBombError:
+            self.reject_pixels()
+        if result is None:
+            return
+        image_format, (width, height) = result
+        if image_format not in OPENED_FORMATS.get(
+            self.image_format, (self.image_format,)
+        ):
+            self.reject('Содержимое файла не соответствует его формату.')
+        if width * height > settings.MAX_IMAGE_PIXELS:
+            self.reject_pixels()
+        self.checked = True
+
+    def file_complete(self, file_size):
+        if not self.checked:
+            if self.image_format is None:
+                self.reject_format()
+            # Размеры не нашлись в начале файла: читаем заголовок
+            # из временного файла
+            self.file.seek(0)
+            self.check_image(self.file)
+            if not self.checked:
+                self.reject('Не удалось прочитать изображение.')
+        return super().file_complete(file_size)
+
+    def reject_format(self):
+        self.reject('Загрузите изображение JPEG, PNG, GIF или WebP.')
+
+    def reject_size(self):
+        self.reject(
+            'Файл больше '
+            f'{filesizeformat(settings.MAX_IMAGE_UPLOAD_SIZE)}.'
+        )
+
+    def reject_pixels(self):
+        self.reject(
+            'Изображение больше '
+            f'{settings.MAX_IMAGE_PIXELS // 1_000_000} Мп.'
+        )
+
+    def reject(self, message):
+        if not hasattr(self.request, 'upload_errors'):
+            self.request.upload_errors = {}
+        self.request.upload_errors[self.field_name] = message
+        raise StopUpload(connection_reset=True)
@@ -5,6 +5,7 @@ from . import views
 app_name = 'blog'
 
 comment_urls = [
+    path('comments/', views.post_comments, name='post_comments'),
     path('comment/', views.CommentCreateView.as_view(),
          name='add_comment'),
     path('edit_comment/<int:comment_id>/',
@@ -29,6 +30,8 @@ urlpatterns = [
     path('posts/', include(post_urls)),
     path('category/<slug:category_slug>/', views.category_posts,
          name='category_posts'),
+    path('search/', views.search, name='search'),
+    path('autocomplete/', views.autocomplete_titles, name='autocomplete'),
     path('profile/edit/', views.edit_profile, name='edit_profile'),
     path('profile/<username>/', views.get_user_detail,
          name='profile')
@@ -1,9 +1,8 @@
 from django.conf import settings
-from django.core.paginator import Paginator
-from django.db.models import Count
 from django.utils import timezone
 
-from .models import Post
+from .models import FeedEntry, Post
+from .paginators import CachedCountPaginator, CursorPage, CursorPaginator
 
 
 def filter_posts(
@@ -14,7 +13,9 @@ def filter_posts(
     Функция для фильтрации постов
     filter_flag=True - фильтр скрытых и отложенных постов,
     скрытых категорий
-    annotation_flag=True - добавление количества комментриев
+    annotation_flag=True - лента: сортировка и без полного текста,
+    в карточке выводится Post.excerpt; количество комментариев
+    хранится в поле Post.comment_count
     """
     queryset = model_manager.select_related(
         'author', 'category', 'location'
@@ -26,13 +27,62 @@ def filter_posts(
             category__is_published=True
         )
     if annotation_flag:
-        queryset = queryset.annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
+        queryset = queryset.order_by('-pub_date', '-pk').defer('text')
     return queryset
 
 
-def paginate_posts(request, post_list):
-    paginator = Paginator(post_list, settings.POSTS_ON_DIPLAY)
+def is_visible_now(post):
+    """
+    Проверка поста, загруженного с категорией, на те же условия,
+    что и filter_posts(filter_flag=True)
+    """
+    return (
+        post.is_published
+        and post.pub_date <= timezone.now()
+        and post.category is not None
+        and post.category.is_published
+    )
+
+
+def feed_posts(**filters):
+    """
+    Видимые посты из таблицы ленты FeedEntry: один проход по индексу
+    без соединений; элементы - посты, собранные из полей записи
+    """
+    return FeedEntry.objects.filter(
+        pub_date__lte=timezone.now(), **filters
+    ).as_posts()
+
+
+def paginate_posts(request, post_list, count_key=None):
+    """
+    Постраничная пагинация ленты или, при включённой настройке
+    POSTS_CURSOR_PAGINATION, курсорная по (pub_date, id)
+    count_key - ключ ленты для кэширования количества постов
+    """
+    if settings.POSTS_CURSOR_PAGINATION:
+        paginator = CursorPaginator(post_list, settings.POSTS_ON_DIPLAY)
+        return paginator.page(request.GET.get('cursor'))
+    paginator = CachedCountPaginator(
+        post_list, settings.POSTS_ON_DIPLAY, count_key=count_key
+    )
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def paginate_comments(post, cursor=None):
+    """
+    Очередная порция комментариев поста по курсору (created_at, id)
+    Курсор, после которого комментариев не осталось, даёт пустую порцию,
+    а не первую: порции дописываются на страницу поста
+    """
+    paginator = CursorPaginator(
+        post.comments.select_related('author', 'rendered'),
+        settings.COMMENTS_ON_DISPLAY,
+        field='created_at',
+        descending=False,
+    )
+    page = paginator.page(cursor)
+    if cursor and not page.has_previous():
+        return CursorPage([], None, None, paginator)
+    return page
@@ -2,23 +2,40 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
 
+from . import autocomplete
+from .conditional import (
+    category_validator, conditional_page, index_validator, post_validator,
+    profile_validator
+)
 from .forms import CommentForm, PostForm, UserForm
-from .mixins import CommentMixin, OnlyAuthorMixin, PostMixin
+from .images import image_annotations
+from .mixins import CommentMixin, OnlyAuthorMixin, PostFormMixin, PostMixin
 from .models import Category, Comment, Post
-from .utils import filter_posts, paginate_posts
+from .page_cache import FEED_TAG, add_cache_tags, cache_anonymous_page
+from .paginators import CachedCountPaginator
+from .search import search_posts
+from .trigrams import similar_categories, similar_posts
+from .utils import (
+    feed_posts, filter_posts, is_visible_now, paginate_comments,
+    paginate_posts
+)
 
 
 User = get_user_model()
 
 
-class PostCreateView(PostMixin, LoginRequiredMixin, CreateView):
-    form_class = PostForm
+class PostCreateView(
+        PostMixin, PostFormMixin, LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
@@ -32,9 +49,9 @@ class PostCreateView(PostMixin, LoginRequiredMixin, CreateView):
 
 class PostUpdateView(
         PostMixin,
+        PostFormMixin,
         OnlyAuthorMixin,
         UpdateView):
-    form_class = PostForm
 
     def get_success_url(self):
         return reverse(
@@ -56,35 +73,58 @@ class PostDeleteView(PostMixin, OnlyAuthorMixin, DeleteView):
         )
 
 
+@method_decorator(conditional_page(post_validator), name='dispatch')
+@method_decorator(cache_anonymous_page(), name='dispatch')
 class PostDetailView(PostMixin, DetailView):
     template_name = 'blog/detail.html'
 
-    def get_object(self, queryset=filter_posts(filter_flag=True)):
-        post = get_object_or_404(filter_posts(), pk=self.kwargs['post_id'])
-        if self.request.user == post.author:
-            return post
-        return super().get_object(queryset)
+    def get_object(self, queryset=None):
+        post = get_object_or_404(
+            filter_posts().select_related('rendered').annotate(
+                **image_annotations()
+            ),
+            pk=self.kwargs['post_id']
+        )
+        if post.author_id != self.request.user.pk and not is_visible_now(post):
+            raise Http404('Публикация не найдена.')
+        add_cache_tags(self.request, f'post:{post.pk}')
+        return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related(
-                'author'
-            )
-        )
+        context['comments'] = paginate_comments(self.object)
         return context
 
 
+@cache_anonymous_page()
+def post_comments(request, post_id):
+    """Следующая порция комментариев поста фрагментом HTML."""
+    post = get_object_or_404(
+        Post.objects.select_related('category'), pk=post_id
+    )
+    if post.author_id != request.user.pk and not is_visible_now(post):
+        raise Http404('Публикация не найдена.')
+    add_cache_tags(request, f'post:{post.pk}')
+    context = {
+        'post': post,
+        'comments': paginate_comments(post, request.GET.get('cursor')),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
 class CommentCreateView(CommentMixin, LoginRequiredMixin, CreateView):
     model = Comment
     post_field = None
     form_class = CommentForm
     pk_url_kwarg = 'post_id'
 
+    @transaction.atomic
     def form_valid(self, form):
+        if not Post.objects.filter(pk=self.kwargs['post_id']).exists():
+            raise Http404('Публикация не найдена.')
         form.instance.author = self.request.user
-        form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
+        form.instance.post_id = self.kwargs['post_id']
         return super().form_valid(form)
 
 
@@ -94,27 +134,58 @@ class CommentUpdateView(CommentMixin, OnlyAuthorMixin, UpdateView):
 
 class CommentDeleteView(CommentMixin, OnlyAuthorMixin, DeleteView):
 
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
     def get_success_url(self):
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.object.post_id}
         )
 
 
+@method_decorator(conditional_page(index_validator), name='dispatch')
+@method_decorator(cache_anonymous_page(FEED_TAG), name='dispatch')
 class Index(ListView):
     model = Post
-    queryset = filter_posts(filter_flag=True, annotation_flag=True)
     paginate_by = settings.POSTS_ON_DIPLAY
+    paginator_class = CachedCountPaginator
     template_name = 'blog/index.html'
 
+    def get_queryset(self):
+        return feed_posts()
 
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, count_key=('index',), approximate=True,
+            **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.POSTS_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        page = paginate_posts(self.request, queryset)
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
+
+@conditional_page(profile_validator)
+@cache_anonymous_page()
 def get_user_detail(request, username):
     profile = get_object_or_404(User, username=username)
-    post_list = filter_posts(
-        model_manager=profile.posts,
-        filter_flag=profile != request.user,
-        annotation_flag=True,
+    add_cache_tags(request, f'author:{profile.pk}')
+    is_owner = profile == request.user
+    if is_owner:
+        post_list = filter_posts(
+            model_manager=profile.posts,
+            annotation_flag=True,
+        )
+    else:
+        post_list = feed_posts(author=profile)
+    page_obj = paginate_posts(
+        request,
+        post_list,
+        count_key=('author', profile.pk, 'owner' if is_owner else 'public')
     )
-    page_obj = paginate_posts(request, post_list)
     context = {
         'page_obj': page_obj,
         'profile': profile,
@@ -130,18 +201,42 @@ def edit_profile(request):
     return render(request, 'blog/user.html', {'form': form})
 
 
+@conditional_page(category_validator)
+@cache_anonymous_page()
 def category_posts(request, category_slug):
     category = get_object_or_404(
         Category, is_published=True, slug=category_slug
     )
-    post_list = filter_posts(
-        model_manager=category.posts,
-        filter_flag=True,
-        annotation_flag=True
+    add_cache_tags(request, f'category:{category.pk}')
+    post_list = feed_posts(category=category)
+    page_obj = paginate_posts(
+        request, post_list, count_key=('category', category.pk)
     )
-    page_obj = paginate_posts(request, post_list)
     context = {
         'category': category,
         'page_obj': page_obj
     }
     return render(request, 'blog/category.html', context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = search_posts(query, request.GET.get('cursor'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'paginator_params': urlencode({'q': query}) + '&',
+    }
+    if query and not request.GET.get('cursor'):
+        # Заголовки с опечатками в запросе полнотекстовый поиск не найдёт
+        context['similar_categories'] = similar_categories(query)
+        if not page_obj:
+            context['similar_posts'] = similar_posts(query)
+    return render(request, 'blog/search.html', context)
+
+
+def autocomplete_titles(request):
+    """Подсказки по началу заголовков постов, категорий и имён авторов."""
+    return JsonResponse(
+        {'results': autocomplete.lookup(request.GET.get('q', ''))}
+    )
@@ -0,0 +1,106 @@
+import logging
+import time
+from pathlib import Path
+
+import django.forms
+import django_bootstrap5
+from django.conf import settings
+from django.db import DatabaseError
+from django.forms.renderers import get_default_renderer
+from django.template import (
+    TemplateDoesNotExist, TemplateSyntaxError, engines
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _names(root, pattern='*.html'):
+    root = Path(root)
+    return [
+        path.relative_to(root).as_posix()
+        for path in sorted(root.rglob(pattern))
+    ]
+
+
+def template_names():
+    """
+    Шаблоны страниц: всё из TEMPLATES_DIR и шаблоны, которые подключают
+    теги django_bootstrap5.
+    """
+    return _names(settings.TEMPLATES_DIR) + _names(
+        Path(django_bootstrap5.__file__).parent / 'templates'
+    )
+
+
+def widget_template_names():
+    """Шаблоны виджетов, которые форма выводит через свой движок."""
+    forms_templates = Path(django.forms.__file__).parent / 'templates'
+    return [
+        name for name in _names(forms_templates)
+        if name.startswith('django/forms/widgets/')
+    ] + [
+        name for name in template_names()
+        if name.startswith('django_bootstrap5/widgets/')
+    ]
+
+
+def warm_up_templates():
+    """
+    Компилирует шаблоны в кэш загрузчиков и возвращает
+    [(имя, секунды)]. Теги django_bootstrap5 загружаются при компиляции
+    первого шаблона с {% load django_bootstrap5 %}. Ошибка в шаблоне
+    записывается в журнал и не мешает запуску процесса.
+    """
+    timings = []
+    sources = (
+        (engines['django'].get_template, template_names()),
+        (get_default_renderer().get_template, widget_template_names()),
+    )
+    for get_template, names in sources:
+        for name in names:
+            started = time.perf_counter()
+            try:
+                get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                logger.exception('Не удалось скомпилировать шаблон %s', name)
+                continue
+            timings.append((name, time.perf_counter() - started))
+    return timings
+
+
+def reset_template_cache():
+    """Очищает кэш скомпилированных шаблонов основного движка и форм."""
+    for engine in (engines['django'], get_default_renderer().engine):
+        for loader in engine.engine.template_loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
+
+
+def warm_up_autocomplete():
+    """Строит индекс подсказок, чтобы его не строил первый запрос."""
+    # Модели загружаются после настройки Django в wsgi.py
+    from . import autocomplete
+
+    started = time.perf_counter()
+    try:
+        stats = autocomplete.get_index().stats()
+    except DatabaseError:
+        logger.exception('Не удалось построить индекс подсказок')
+        return
+    logger.info(
+        'Построен индекс подсказок: %d записей за %.1f мс',
+        stats['entries'], (time.perf_counter() - started) * 1000
+    )
+
+
+def warm_up():
+    """Вызывается из wsgi.py и asgi.py до приёма первого запроса."""
+    if settings.AUTOCOMPLETE_WARMUP:
+        warm_up_autocomplete()
+    if not settings.TEMPLATE_WARMUP:
+        return
+    timings = warm_up_templates()
+    logger.info(
+        'Скомпилировано шаблонов: %d за %.1f мс', len(timings),
+        sum(seconds for name, seconds in timings) * 1000
+    )
@@ -11,6 +11,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from blog.warmup import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+# Шаблоны и индекс подсказок готовятся до того, как процесс начнёт
+# принимать запросы
+warm_up()
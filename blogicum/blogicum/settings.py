@@ -47,12 +47,21 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Скомпилированные шаблоны хранятся в памяти процесса;
+            # при DEBUG правки шаблонов видны без перезапуска
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -77,6 +86,22 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/ref/settings/#caches
+
+# Адрес memcached, общего для всех процессов сервера; без него каждый
+# процесс хранит кэш у себя и не видит сбросов из других процессов
+CACHE_LOCATION = os.getenv('CACHE_LOCATION')
+
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_LOCATION,
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -119,6 +144,11 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# Имена с хешем содержимого и сжатые копии .gz при collectstatic
+STATICFILES_STORAGE = 'blog.storage.CompressedManifestStaticFilesStorage'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -132,9 +162,66 @@ LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Кто отдаёт тело загруженного файла: 'python' - Django через
+# FileResponse, 'x-accel-redirect' - nginx, 'x-sendfile' - Apache
+# или lighttpd
+MEDIA_SERVE_MODE = os.getenv('MEDIA_SERVE_MODE', 'python')
+# Внутренний location nginx с alias на MEDIA_ROOT для X-Accel-Redirect
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 # Количество постов на странице пагинатора
 POSTS_ON_DIPLAY = 10
+
+# Курсорная пагинация лент по (pub_date, id) вместо постраничной
+POSTS_CURSOR_PAGINATION = (
+    os.getenv('POSTS_CURSOR_PAGINATION', 'False') == 'True'
+)
+
+# Время хранения количества постов в ленте в кэше, секунды
+POSTS_COUNT_CACHE_TIMEOUT = 60
+
+# Получать количество постов через COUNT(*) OVER() вместе со страницей
+POSTS_COUNT_WINDOW = os.getenv('POSTS_COUNT_WINDOW', 'False') == 'True'
+
+# Размер таблицы, начиная с которого количество постов в общей ленте
+# берётся из статистики СУБД; None - всегда точный подсчёт
+POSTS_COUNT_APPROXIMATE_AFTER = None
+
+# Количество комментариев, подгружаемых на странице поста за раз
+COMMENTS_ON_DISPLAY = 50
+
+# Время хранения отрендеренных карточек постов в кэше, секунды
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Количество процессов, создающих уменьшенные копии изображений;
+# 0 - копии создаются сразу при сохранении поста
+IMAGE_VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', '2'))
+
+# Компилировать все шаблоны при запуске процесса, до первого запроса
+TEMPLATE_WARMUP = os.getenv('TEMPLATE_WARMUP', 'True') == 'True'
+
+# Строить индекс подсказок при запуске процесса, до первого запроса
+AUTOCOMPLETE_WARMUP = os.getenv('AUTOCOMPLETE_WARMUP', 'True') == 'True'
+
+# Загружаемые файлы сразу пишутся на диск, изображения проверяются
+# по заголовку до чтения всего файла
+FILE_UPLOAD_HANDLERS = ['blog.uploads.ImageUploadHandler']
+# Максимальный размер загружаемого изображения, байты
+MAX_IMAGE_UPLOAD_SIZE = 10 * 1024 * 1024
+# Максимальное количество пикселей загружаемого изображения
+MAX_IMAGE_PIXELS = 40_000_000
+
+# Кэш страниц лент и постов для анонимных пользователей; по умолчанию
+# включён только с общим кэшем CACHE_LOCATION
+PAGE_CACHE_ENABLED = (
+    os.getenv('PAGE_CACHE_ENABLED', str(bool(CACHE_LOCATION))) == 'True'
+)
+
+# Время хранения страницы в кэше страниц, секунды
+PAGE_CACHE_TIMEOUT = 60 * 5
@@ -1,9 +1,12 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
+
+from blog.media import serve_media, serve_static
 
 urlpatterns = [
     path('', include('blog.urls')),
@@ -17,8 +20,18 @@ urlpatterns = [
             form_class=UserCreationForm,
             success_url=reverse_lazy('blog:index')
         ), name='registration'
-    )
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    ),
+    re_path(
+        r'^{}(?P<path>.+)$'.format(re.escape(settings.MEDIA_URL.lstrip('/'))),
+        serve_media,
+        name='media'
+    ),
+    re_path(
+        r'^{}(?P<path>.+)$'.format(re.escape(settings.STATIC_URL.lstrip('/'))),
+        serve_static,
+        name='static'
+    ),
+]
 
 handler404 = 'pages.views.page_not_found'
 
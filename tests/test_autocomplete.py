@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import autocomplete
+from blog.warmup import warm_up
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    # Номера изменений в тестовой базе повторяются после отката
+    monkeypatch.setattr(autocomplete, "_index", None)
+
+
+@pytest.mark.django_db
+def test_autocomplete_follows_changes(client, mixer, user, published_category):
+    def create(title, **kwargs):
+        fields = {
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            **kwargs,
+        }
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title=title, **fields
+        )
+
+    post = create("Зимний поход")
+    create("Зимовье скрытое", is_published=False)
+    create("Зимовка будущая", pub_date=timezone.now() + timedelta(days=1))
+    labels = [item["label"] for item in autocomplete.lookup("зим")]
+    assert labels == ["Зимний поход"], (
+        "Убедитесь, что подсказки содержат только видимые посты."
+    )
+    index = autocomplete.get_index()
+
+    post.title = "Летний поход"
+    post.save()
+    cache.clear()
+    user.username = "зимняя_сова"
+    user.save()
+    response = client.get("/autocomplete/", {"q": "ЗИМ"})
+    assert response.json()["results"] == [{
+        "type": "user",
+        "label": "зимняя_сова",
+        "url": reverse("blog:profile", args=["зимняя_сова"]),
+    }], "Убедитесь, что индекс подсказок обновляется при изменениях."
+    assert autocomplete.get_index() is index, (
+        "Убедитесь, что изменения применяются к индексу без перестроения"
+        " и не теряются при очистке кэша."
+    )
+    assert index.stats()["memory_bytes"] > 0
+
+    published_category.is_published = False
+    published_category.save()
+    assert not autocomplete.lookup("летн")
+    assert autocomplete.get_index() is not index
+
+
+@pytest.mark.django_db
+def test_index_built_at_startup(settings, mixer, user, published_category):
+    settings.TEMPLATE_WARMUP = False
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, title="Осенний лес",
+        pub_date=timezone.now() - timedelta(days=1)
+    )
+    warm_up()
+    assert autocomplete._index is not None, (
+        "Убедитесь, что индекс подсказок строится при запуске процесса."
+    )
+    assert autocomplete._index.stats()["posts"] == 1
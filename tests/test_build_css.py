@@ -0,0 +1,31 @@
+from django.core.management import call_command
+
+from blog.css import purge
+
+STYLESHEET = (
+    '@charset "UTF-8";/*! license */:root{--x:1}body{margin:0}'
+    '.btn,.unused{color:red}.btn:not(.disabled):hover{color:blue}'
+    '.nav .unused{top:0}@media (min-width:576px){.btn{padding:0}'
+    '.unused{padding:1px}}@media print{.unused{display:none}}'
+    '@keyframes spin{to{transform:rotate(1turn)}}.spinner{animation:spin 1s}'
+    '@keyframes fade{to{opacity:0}}.fader{animation:fade 1s}'
+)
+
+
+def test_purge_keeps_only_used_rules():
+    result = purge(STYLESHEET, {"btn", "spinner", "nav"})
+    assert result == (
+        '@charset "UTF-8";/*! license */:root{--x:1}body{margin:0}'
+        ".btn{color:red}.btn:not(.disabled):hover{color:blue}"
+        "@media (min-width:576px){.btn{padding:0}}"
+        "@keyframes spin{to{transform:rotate(1turn)}}"
+        ".spinner{animation:spin 1s}"
+    ), (
+        "Убедитесь, что очистка оставляет правила с используемыми классами,"
+        " правила по тегам и используемые анимации."
+    )
+
+
+def test_built_css_is_up_to_date():
+    # Завершится ошибкой, если стили не пересобраны после правки шаблонов
+    call_command("build_css", check=True)
@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, FeedEntry, Post
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(
+        mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post, author=user)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария увеличивается счётчик"
+        " `comment_count` публикации."
+    )
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " `comment_count` публикации."
+    )
+    another_post = mixer.blend(Post, author=user)
+    comments[1].post = another_post
+    comments[1].save()
+    post.refresh_from_db()
+    another_post.refresh_from_db()
+    assert (post.comment_count, another_post.comment_count) == (1, 1), (
+        "Убедитесь, что при переносе комментария в другую публикацию"
+        " счётчики обеих публикаций пересчитываются."
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=10)
+    call_command('recount_comments', batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` исправляет счётчик"
+        " комментариев."
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_fixes_feed(
+        client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend(Comment, post=post, author=user)
+    client.get('/')
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    FeedEntry.objects.filter(pk=post.pk).update(comment_count=7)
+    call_command('recount_comments', stdout=StringIO())
+    assert FeedEntry.objects.get(pk=post.pk).comment_count == 1, (
+        "Убедитесь, что команда `recount_comments` исправляет счётчик"
+        " в записи ленты."
+    )
+    assert 'Комментарии (1)' in client.get('/').content.decode('utf-8'), (
+        "Убедитесь, что после пересчёта лента выводит новый счётчик."
+    )
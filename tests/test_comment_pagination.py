@@ -0,0 +1,70 @@
+import re
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Comment
+
+NEXT_LINK = re.compile(r'href="([^"]+/comments/\?cursor=[^"]+)"')
+
+
+@pytest.mark.django_db
+def test_comments_loaded_by_cursor(
+        client, settings, mixer, user, post_with_published_location
+):
+    settings.COMMENTS_ON_DISPLAY = 2
+    comments = mixer.cycle(5).blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    # Одинаковое время создания: порядок задаётся id
+    Comment.objects.filter(
+        pk__in=[comment.pk for comment in comments[1:3]]
+    ).update(created_at=timezone.now())
+    expected = list(
+        Comment.objects.order_by("created_at", "pk").values_list(
+            "pk", flat=True
+        )
+    )
+    response = client.get(f"/posts/{post_with_published_location.id}/")
+    assert [
+        comment.pk for comment in response.context["comments"]
+    ] == expected[:2], (
+        "Убедитесь, что страница поста выводит только первую порцию"
+        " комментариев."
+    )
+    loaded = expected[:2]
+    content = response.content.decode("utf-8")
+    while match := NEXT_LINK.search(content):
+        response = client.get(match.group(1).replace("&amp;", "&"))
+        loaded.extend(comment.pk for comment in response.context["comments"])
+        content = response.content.decode("utf-8")
+    assert loaded == expected, (
+        "Убедитесь, что порции комментариев подгружаются по курсору"
+        " без пропусков и повторов."
+    )
+    last_cursor = NEXT_LINK.findall(
+        client.get(f"/posts/{post_with_published_location.id}/")
+        .content.decode("utf-8")
+    )
+    assert last_cursor
+    Comment.objects.filter(pk__in=expected[2:]).delete()
+    response = client.get(last_cursor[0])
+    assert not list(response.context["comments"]), (
+        "Убедитесь, что курсор после последнего комментария возвращает"
+        " пустую порцию."
+    )
+
+
+@pytest.mark.django_db
+def test_comments_fragment_hidden_post(
+        client, user_client, post_with_published_location
+):
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    url = f"/posts/{post_with_published_location.id}/comments/"
+    assert user_client.get(url).status_code == 200
+    response = client.get(url)
+    assert response.status_code == 404, (
+        "Убедитесь, что комментарии скрытого поста недоступны"
+        " другим пользователям."
+    )
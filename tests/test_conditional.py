@@ -0,0 +1,123 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.middleware.csrf import _get_new_csrf_token
+from django.test.utils import CaptureQueriesContext
+
+from blog.conditional import index_validator
+
+
+@pytest.mark.django_db
+def test_post_detail_conditional_get(
+        client, mixer, user, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    ), "Убедитесь, что страница поста отдаёт заголовки ETag и Last-Modified."
+    etag = response["ETag"]
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что на запрос с актуальным If-None-Match страница поста"
+        " отвечает 304."
+    )
+    mixer.blend("blog.Comment", post=post_with_published_location, author=user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после добавления комментария ETag страницы поста"
+        " меняется."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_conditional_get(
+        client, user_client, mixer, user, published_category,
+        post_with_published_location
+):
+    for url in ("/", f"/category/{published_category.slug}/",
+                f"/profile/{user.username}/"):
+        etag = client.get(url)["ETag"]
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что лента {url} отвечает 304 на актуальный ETag."
+        )
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            "Убедитесь, что ETag ленты зависит от пользователя."
+        )
+    etag = client.get("/")["ETag"]
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True
+    )
+    assert client.get(
+        "/", HTTP_IF_NONE_MATCH=etag
+    ).status_code == HTTPStatus.OK, (
+        "Убедитесь, что после публикации поста ETag ленты меняется."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_etag_independent_of_cache(
+        client, published_category, post_with_published_location
+):
+    url = f"/category/{published_category.slug}/"
+    etag = client.get(url)["ETag"]
+    cache.clear()
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что ETag ленты одинаков во всех процессах сервера"
+        " и не зависит от содержимого кэша."
+    )
+    post_with_published_location.title = "Новый заголовок"
+    post_with_published_location.save()
+    cache.clear()
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag ленты меняется после изменения поста."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_validator_does_not_scan_feed(
+        rf, published_category,
+        post_with_published_location
+):
+    request = rf.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        index_validator(request)
+    assert len(queries) == 2
+    assert not any(
+        function in query["sql"].upper()
+        for query in queries for function in ("COUNT(", "MAX(")
+    ), (
+        "Убедитесь, что ETag ленты строится по версии ленты и индексу,"
+        " без агрегатов по всем её записям."
+    )
+
+
+@pytest.mark.django_db
+def test_post_etag_changes_with_csrf_token(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    user_client.cookies[settings.CSRF_COOKIE_NAME] = _get_new_csrf_token()
+    response = user_client.get(url)
+    assert not response.has_header("Last-Modified")
+    etag = response["ETag"]
+    # Новый токен, как после повторного входа
+    user_client.cookies[settings.CSRF_COOKIE_NAME] = _get_new_csrf_token()
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == HTTPStatus.OK, (
+        "Убедитесь, что после смены токена CSRF страница с формой"
+        " не отдаётся из кэша браузера."
+    )
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def posts_with_same_pub_date(mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.mark.django_db
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_cursor_pagination_walks_feed(client, posts_with_same_pub_date):
+    seen = []
+    pages = []
+    url = "/"
+    while url:
+        page_obj = client.get(url).context["page_obj"]
+        pages.append(page_obj)
+        seen.extend(post.id for post in page_obj)
+        url = (
+            f"/?cursor={page_obj.next_cursor}" if page_obj.has_next() else None
+        )
+    assert sorted(seen) == sorted(p.id for p in posts_with_same_pub_date), (
+        "Убедитесь, что курсорная пагинация выводит каждый пост ровно один"
+        " раз, даже если у постов совпадает дата публикации."
+    )
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 3]
+
+    previous = client.get(f"/?cursor={pages[-1].previous_cursor}")
+    assert (
+        [post.id for post in previous.context["page_obj"]]
+        == [post.id for post in pages[1]]
+    ), "Убедитесь, что курсор на предыдущую страницу возвращает её посты."
+
+
+@pytest.mark.django_db
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_cursor_pagination_ignores_broken_cursor(
+        client, posts_with_same_pub_date
+):
+    response = client.get("/?cursor=not-a-cursor")
+    assert len(response.context["page_obj"]) == N_PER_PAGE, (
+        "Убедитесь, что при некорректном курсоре выводится первая страница."
+    )
@@ -0,0 +1,120 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.cards import card_cache_key
+from blog.models import FeedEntry
+
+
+@pytest.mark.django_db
+def test_feed_follows_category_and_post_changes(
+        mixer, user, published_category
+):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True
+    )
+    assert FeedEntry.objects.count() == 3, (
+        "Убедитесь, что опубликованные посты попадают в таблицу ленты."
+    )
+    posts[0].is_published = False
+    posts[0].save()
+    assert not FeedEntry.objects.filter(pk=posts[0].pk).exists(), (
+        "Убедитесь, что снятый с публикации пост удаляется из ленты."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert not FeedEntry.objects.exists(), (
+        "Убедитесь, что при скрытии категории её посты удаляются из ленты."
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert set(FeedEntry.objects.values_list("pk", flat=True)) == {
+        posts[1].pk, posts[2].pk
+    }
+
+
+@pytest.mark.django_db
+def test_feed_card_fields_follow_author(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True
+    )
+    user.username = "renamed_author"
+    user.save()
+    response = client.get("/")
+    assert "@renamed_author" in response.content.decode(), (
+        "Убедитесь, что карточка поста в ленте показывает актуальное имя"
+        " автора."
+    )
+    assert response.context["page_obj"][0] == post
+
+
+@pytest.mark.django_db
+def test_post_cards_cached_and_invalidated(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True
+    )
+    client.get("/")
+    post.refresh_from_db()
+    assert cache.get(card_cache_key(post)), (
+        "Убедитесь, что отрендеренная карточка поста сохраняется в кэше."
+    )
+    published_category.title = "Новое название категории"
+    published_category.save()
+    content = client.get("/").content.decode()
+    assert "Новое название категории" in content, (
+        "Убедитесь, что при изменении категории карточки её постов"
+        " рендерятся заново."
+    )
+
+
+@pytest.mark.django_db
+def test_feeds_do_not_load_post_body(user_client, user, published_category):
+    post = user.posts.create(
+        title="Пост", text=" ".join(["слово"] * 50),
+        category=published_category, pub_date="2000-01-01T00:00:00Z"
+    )
+    assert post.excerpt == " ".join(["слово"] * 10) + "…", (
+        "Убедитесь, что анонс поста вычисляется при сохранении."
+    )
+    post.text = "Новый текст"
+    post.save()
+    assert FeedEntry.objects.get(pk=post.pk).excerpt == "Новый текст"
+    for url in ("/", f"/profile/{user.username}/"):
+        with CaptureQueriesContext(connection) as queries:
+            content = user_client.get(url).content.decode("utf-8")
+        assert "Новый текст" in content
+        assert not any(
+            '"blog_post"."text"' in query["sql"] for query in queries
+        ), f"Убедитесь, что лента {url} не загружает полный текст постов."
+
+
+@pytest.mark.django_db
+def test_category_changes_update_feed_in_place(
+        mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True
+    )
+    published_category.description = "Новое описание"
+    with CaptureQueriesContext(connection) as queries:
+        published_category.save()
+    assert not any("blog_feedentry" in query["sql"] for query in queries), (
+        "Убедитесь, что изменение описания категории не затрагивает ленту."
+    )
+    published_category.title = "Новое название"
+    with CaptureQueriesContext(connection) as queries:
+        published_category.save()
+    assert not any(
+        query["sql"].startswith(("DELETE", "INSERT"))
+        and "blog_feedentry" in query["sql"] for query in queries
+    ), "Убедитесь, что при смене названия записи ленты обновляются на месте."
+    assert FeedEntry.objects.get(pk=post.pk).category_title == "Новое название"
@@ -0,0 +1,15 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_feed_queries_use_indexes():
+    try:
+        call_command('check_feed_plans', stdout=StringIO())
+    except Exception as e:
+        raise AssertionError(
+            "Убедитесь, что запросы лент используют индексы для сортировки"
+            f" и диапазона дат публикации:\n{e}"
+        )
@@ -0,0 +1,83 @@
+import re
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.test import RequestFactory
+from PIL import Image
+
+from blog.media import serve_media
+from blog.models import FeedEntry, Post, StoredImage
+
+
+def make_image(color):
+    buffer = BytesIO()
+    Image.new("RGB", (100, 50), color=color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANT_WORKERS = 0
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_hashed_file(
+        mixer, user, published_category, media_root
+):
+    content = make_image((73, 109, 137))
+    posts = [
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            image=ImageFile(BytesIO(content), name=name)
+        )
+        for name in ("first.JPG", "second.jpg")
+    ]
+    name = posts[0].image.name
+    assert re.fullmatch(
+        r"blog_images/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.jpg", name
+    ), "Убедитесь, что изображение сохраняется под именем из хеша."
+    assert posts[1].image.name == name, (
+        "Убедитесь, что одинаковые файлы хранятся один раз."
+    )
+    assert (media_root / name).read_bytes() == content
+
+    request = RequestFactory().get(f"/{name}")
+    response = serve_media(request, name, document_root=media_root)
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени кэшируются бессрочно."
+    )
+
+
+@pytest.mark.django_db
+def test_migrate_media_to_hashed(
+        mixer, user, published_category, media_root
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True
+    )
+    old_name = "blog_images/legacy.jpg"
+    (media_root / "blog_images").mkdir(exist_ok=True)
+    (media_root / old_name).write_bytes(make_image((200, 10, 10)))
+    Post.objects.filter(pk=post.pk).update(image=old_name)
+    FeedEntry.objects.filter(post_id=post.pk).update(image=old_name)
+    StoredImage.objects.create(name=old_name, width=100, height=50)
+
+    call_command("migrate_media_to_hashed")
+
+    post.refresh_from_db()
+    assert post.image.name != old_name and (
+        media_root / post.image.name
+    ).exists(), "Убедитесь, что команда переносит файл в новое хранилище."
+    assert not (media_root / old_name).exists()
+    assert StoredImage.objects.filter(name=post.image.name).exists()
+    assert not StoredImage.objects.filter(name=old_name).exists()
+    assert set(
+        FeedEntry.objects.filter(post_id=post.pk).values_list(
+            "image", flat=True
+        )
+    ) <= {post.image.name}
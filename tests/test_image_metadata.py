@@ -0,0 +1,54 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import StoredImage
+
+
+@pytest.mark.django_db
+def test_image_metadata_stored_and_backfilled(
+        client, settings, tmp_path, mixer, user, published_category
+):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANT_WORKERS = 0
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    Image.new("RGB", (200, 100), color=(73, 109, 137)).save(
+        buffer, format="JPEG", exif=exif.tobytes()
+    )
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date="2000-01-01T00:00:00Z",
+        image=ImageFile(buffer, name="rotated.jpg")
+    )
+    stored = StoredImage.objects.get(name=post.image.name)
+    metadata = (stored.width, stored.height, stored.orientation)
+    assert metadata == (100, 200, 6), (
+        "Убедитесь, что размеры изображения сохраняются с учётом"
+        " ориентации из EXIF."
+    )
+    assert stored.size == (tmp_path / post.image.name).stat().st_size
+    assert stored.placeholder.startswith("data:image/jpeg;base64,")
+
+    for url in ("/", f"/posts/{post.id}/"):
+        content = client.get(url).content.decode("utf-8")
+        assert 'width="100" height="200"' in content, (
+            "Убедитесь, что изображение поста выводится с размерами."
+        )
+
+    StoredImage.objects.all().delete()
+    call_command("extract_image_metadata", batch_size=1)
+    assert StoredImage.objects.get().height == 200, (
+        "Убедитесь, что команда extract_image_metadata заполняет сведения"
+        " об изображениях."
+    )
+    output = StringIO()
+    call_command("extract_image_metadata", stdout=output)
+    assert "Обработано изображений: 0" in output.getvalue(), (
+        "Убедитесь, что повторный запуск пропускает обработанные"
+        " изображения."
+    )
@@ -0,0 +1,70 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import StoredImage
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANT_WORKERS = 0
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_image_variants_generated_and_backfilled(
+        client, mixer, user, published_category, media_root
+):
+    buffer = BytesIO()
+    Image.new("RGB", (1000, 500), color=(73, 109, 137)).save(
+        buffer, format="JPEG"
+    )
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date="2000-01-01T00:00:00Z",
+        image=ImageFile(buffer, name="wide.jpg")
+    )
+    image_path = media_root / post.image.name
+    variants = image_path.parent / "variants"
+    stem = image_path.stem
+    expected = {
+        f"{stem}_{width}w.{extension}"
+        for width in (320, 640) for extension in ("jpg", "webp")
+    }
+    assert {path.name for path in variants.iterdir()} == expected, (
+        "Убедитесь, что при загрузке изображения создаются уменьшенные"
+        " копии и WebP."
+    )
+    with Image.open(variants / f"{stem}_640w.webp") as image:
+        assert image.size == (640, 320)
+
+    content = client.get("/").content.decode("utf-8")
+    assert f"{stem}_640w.webp 640w" in content, (
+        "Убедитесь, что карточка поста выводит srcset."
+    )
+    assert 'loading="lazy"' in content, (
+        "Убедитесь, что изображение в карточке загружается лениво."
+    )
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert f"{stem}_320w.jpg 320w" in content
+    assert f"{post.image.url} 1000w" in content, (
+        "Убедитесь, что исходное изображение входит в srcset со своей"
+        " шириной."
+    )
+    assert 'loading="lazy"' not in content
+
+    StoredImage.objects.all().delete()
+    for path in variants.iterdir():
+        path.unlink()
+    # Сведения об изображении без копий не должны считаться готовыми
+    call_command("extract_image_metadata", stdout=StringIO())
+    call_command("generate_image_variants", workers=1)
+    assert {path.name for path in variants.iterdir()} == expected, (
+        "Убедитесь, что команда generate_image_variants создаёт копии"
+        " для уже загруженных изображений."
+    )
+    assert StoredImage.objects.get().variant_widths == (320, 640)
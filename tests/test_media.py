@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+
+NAME = "blog_images/ab/cd/" + "abcd" * 16 + ".jpg"
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    path = tmp_path / NAME
+    path.parent.mkdir(parents=True)
+    path.write_bytes(CONTENT)
+    return f"/media/{NAME}"
+
+
+def body(response):
+    return b"".join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_media_full_and_conditional(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == HTTPStatus.OK
+    assert body(response) == CONTENT
+    assert response["Content-Type"] == "image/jpeg"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени кэшируются бессрочно."
+    )
+    assert response["Accept-Ranges"] == "bytes"
+    assert client.get(
+        media_file, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что на актуальный If-None-Match файл отвечает 304."
+    )
+    assert client.get(
+        media_file, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    assert client.get("/media/../manage.py").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=10000-", 10000, len(CONTENT) - 1),
+    ("bytes=-240", len(CONTENT) - 240, len(CONTENT) - 1),
+    ("bytes=100-999999", 100, len(CONTENT) - 1),
+])
+def test_media_range(client, media_file, header, start, end):
+    response = client.get(media_file, HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT, (
+        "Убедитесь, что файл отдаётся по диапазонам байтов."
+    )
+    assert response["Content-Range"] == (
+        f"bytes {start}-{end}/{len(CONTENT)}"
+    )
+    assert int(response["Content-Length"]) == end - start + 1
+    assert body(response) == CONTENT[start:end + 1]
+
+
+@pytest.mark.django_db
+def test_media_range_edge_cases(client, media_file):
+    response = client.get(media_file, HTTP_RANGE="bytes=99999-")
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response["Content-Range"] == f"bytes */{len(CONTENT)}"
+    response = client.get(
+        media_file, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"outdated"'
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что при устаревшем If-Range отдаётся весь файл."
+    )
+    assert body(response) == CONTENT
+
+
+@pytest.mark.django_db
+def test_media_offloaded_to_proxy(client, settings, media_file):
+    settings.MEDIA_SERVE_MODE = "x-accel-redirect"
+    response = client.get(media_file)
+    assert response["X-Accel-Redirect"] == f"/protected-media/{NAME}"
+    assert response.content == b""
+    settings.MEDIA_SERVE_MODE = "x-sendfile"
+    response = client.get(media_file)
+    assert response["X-Sendfile"].endswith(NAME)
@@ -0,0 +1,68 @@
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import StoredImage
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANT_WORKERS = 0
+    return tmp_path
+
+
+def upload(mixer, user, category, color):
+    buffer = BytesIO()
+    Image.new("RGB", (700, 350), color=color).save(buffer, format="JPEG")
+    return mixer.blend(
+        "blog.Post", author=user, category=category,
+        image=ImageFile(buffer, name="photo.jpg")
+    )
+
+
+def files(root):
+    return {
+        os.path.relpath(os.path.join(path, name), root)
+        for path, _, names in os.walk(root) for name in names
+    }
+
+
+@pytest.mark.django_db
+def test_collect_orphaned_media(mixer, user, published_category, media_root):
+    kept = upload(mixer, user, published_category, (10, 20, 30))
+    replaced = upload(mixer, user, published_category, (200, 100, 50))
+    orphan = replaced.image.name
+    replaced.image = kept.image.name
+    replaced.save()
+    fresh = upload(mixer, user, published_category, (1, 2, 3))
+    fresh_name = fresh.image.name
+    fresh.delete()
+    old = os.path.getmtime(media_root / orphan) - 2 * 60 * 60
+    for name in files(media_root) - {fresh_name}:
+        os.utime(media_root / name, (old, old))
+    before = files(media_root)
+
+    call_command("collect_orphaned_media", dry_run=True, pause=0)
+    assert files(media_root) == before, (
+        "Убедитесь, что с --dry-run команда ничего не удаляет."
+    )
+
+    call_command("collect_orphaned_media", pause=0, batch_size=1)
+    after = files(media_root)
+    assert orphan not in after and not any(
+        "variants" in name and os.path.basename(orphan)[:64] in name
+        for name in after
+    ), "Убедитесь, что команда удаляет изображение без поста и его копии."
+    assert kept.image.name in after and fresh_name in after, (
+        "Убедитесь, что используемые и недавно загруженные файлы"
+        " не удаляются."
+    )
+    assert len(after) == len(before) - 5, (
+        "Убедитесь, что копии используемых изображений не удаляются."
+    )
+    assert not StoredImage.objects.filter(name=orphan).exists()
@@ -0,0 +1,78 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.checks import run_checks
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog import page_cache
+
+
+@pytest.fixture(autouse=True)
+def page_cache_enabled(settings):
+    settings.PAGE_CACHE_ENABLED = True
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_cached_and_purged_by_tags(
+        client, mixer, user, published_category, post_with_published_location
+):
+    post_url = f"/posts/{post_with_published_location.id}/"
+    category_url = f"/category/{published_category.slug}/"
+    for url in ("/", post_url, category_url):
+        assert client.get(url)["X-Page-Cache"] == "MISS"
+        assert client.get(url)["X-Page-Cache"] == "HIT", (
+            "Убедитесь, что страница для анонимного пользователя отдаётся"
+            " из кэша."
+        )
+
+    mixer.blend("blog.Comment", post=post_with_published_location, author=user)
+    assert client.get(post_url)["X-Page-Cache"] == "MISS", (
+        "Убедитесь, что новый комментарий сбрасывает кэш страницы поста."
+    )
+    assert client.get("/")["X-Page-Cache"] == "MISS"
+
+    other_category = mixer.blend("blog.Category", is_published=True)
+    other_category.title = "Другая категория"
+    other_category.save()
+    assert client.get(post_url)["X-Page-Cache"] == "HIT", (
+        "Убедитесь, что изменение категории не сбрасывает страницы постов"
+        " из других категорий."
+    )
+    assert page_cache.stats()["hits"] == 4
+
+
+@pytest.mark.django_db
+def test_authenticated_pages_not_cached(user_client):
+    user_client.get("/")
+    assert "X-Page-Cache" not in user_client.get("/"), (
+        "Убедитесь, что страницы авторизованных пользователей не кэшируются."
+    )
+
+
+def test_page_not_stored_when_purged_during_render():
+    @page_cache.cache_anonymous_page(page_cache.FEED_TAG)
+    def view(request):
+        page_cache.add_cache_tags(request, "post:1")
+        page_cache.purge("post:1")
+        return HttpResponse("старая страница")
+
+    def get():
+        request = RequestFactory().get("/posts/1/")
+        request.user = AnonymousUser()
+        return view(request)["X-Page-Cache"]
+
+    assert get() == "MISS"
+    assert get() == "MISS", (
+        "Убедитесь, что страница не сохраняется в кэш, если её тег"
+        " сбросили во время рендера."
+    )
+
+
+def test_local_memory_cache_rejected(settings):
+    settings.DEBUG = False
+    errors = [error.id for error in run_checks()]
+    assert "blog.E001" in errors, (
+        "Убедитесь, что кэш страниц с LocMemCache не проходит проверку."
+    )
+    settings.PAGE_CACHE_ENABLED = False
+    assert "blog.E001" not in [error.id for error in run_checks()]
@@ -0,0 +1,105 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import CachedCountPaginator
+from blog.scheduling import feed_valid_until
+from blog.utils import feed_posts
+from conftest import N_PER_PAGE
+
+
+@pytest.mark.django_db
+@override_settings(POSTS_COUNT_WINDOW=True)
+def test_window_count_in_page_query(
+        django_assert_num_queries, many_posts_with_published_locations
+):
+    paginator = CachedCountPaginator(
+        Post.objects.order_by('-pub_date'), N_PER_PAGE, count_key=('test',)
+    )
+    with django_assert_num_queries(1):
+        page = paginator.get_page(2)
+        assert paginator.count == len(many_posts_with_published_locations)
+    assert len(page) == N_PER_PAGE
+
+    paginator = CachedCountPaginator(
+        Post.objects.order_by('-pub_date'), N_PER_PAGE, count_key=('test',)
+    )
+    with django_assert_num_queries(1):
+        assert len(paginator.get_page(1)) == N_PER_PAGE
+        assert paginator.count == len(many_posts_with_published_locations), (
+            "Убедитесь, что количество постов берётся из кэша."
+        )
+
+
+@pytest.mark.django_db
+def test_cached_count_invalidated_on_post_write(
+        mixer, user, published_category, many_posts_with_published_locations
+):
+    def count():
+        return CachedCountPaginator(
+            Post.objects.all(), N_PER_PAGE,
+            count_key=('category', published_category.pk)
+        ).count
+
+    initial = count()
+    mixer.blend(Post, author=user, category=published_category)
+    assert count() == initial + 1, (
+        "Убедитесь, что кэш количества постов сбрасывается при создании"
+        " поста."
+    )
+
+
+@pytest.mark.django_db
+def test_scheduled_post_appears_without_restart(
+        client, mixer, user, published_category, monkeypatch
+):
+    post = mixer.blend(
+        Post, author=user, category=published_category, is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=1)
+    )
+    assert feed_valid_until() == post.pub_date, (
+        "Убедитесь, что лента действительна до ближайшей отложенной"
+        " публикации."
+    )
+    assert post not in client.get("/").context["page_obj"]
+    # Часы процесса и кэша переводятся на момент после выхода поста
+    shift = post.pub_date - timezone.now() + timedelta(seconds=1)
+    real_now, real_time = timezone.now, time.time
+    monkeypatch.setattr(timezone, "now", lambda: real_now() + shift)
+    monkeypatch.setattr(
+        time, "time", lambda: real_time() + shift.total_seconds()
+    )
+    assert post in client.get("/").context["page_obj"], (
+        "Убедитесь, что отложенный пост появляется в ленте после наступления"
+        " даты публикации без перезапуска сервера."
+    )
+
+
+@pytest.mark.django_db
+def test_estimated_count_excludes_hidden_posts(
+        settings, mixer, user, published_category,
+        many_posts_with_published_locations
+):
+    settings.POSTS_COUNT_APPROXIMATE_AFTER = 1
+    mixer.cycle(3).blend(
+        Post, author=user, category=published_category, is_published=True,
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    mixer.cycle(2).blend(
+        Post, author=user, category=published_category, is_published=False
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    paginator = CachedCountPaginator(
+        feed_posts(), N_PER_PAGE, approximate=True
+    )
+    assert paginator.count == len(many_posts_with_published_locations), (
+        "Убедитесь, что оценка количества постов в ленте не учитывает"
+        " скрытые и отложенные посты."
+    )
+    assert paginator.is_approximate
@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_post_detail_queries(
+        user_client, another_user_client, django_assert_num_queries,
+        post_with_published_location, comment_to_a_post
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    # Проверка для условного запроса, сессия, пользователь,
+    # пост, комментарии.
+    for client in (user_client, another_user_client):
+        with django_assert_num_queries(5):
+            client.get(url)
+
+
+@pytest.mark.django_db
+def test_post_edit_fetches_post_once(
+        user_client, django_assert_num_queries, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    # Пост, сессия, пользователь, варианты местоположения и категории.
+    with django_assert_num_queries(5):
+        user_client.get(f"{url}edit/")
+    with django_assert_num_queries(4):
+        user_client.get(f"{url}delete/")
@@ -0,0 +1,33 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import RenderedComment, RenderedPost
+
+
+@pytest.mark.django_db
+def test_text_html_stored_on_save_and_backfilled(
+        client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    post.text = "<b>Первая</b>\nвторая"
+    post.save()
+    mixer.blend(
+        "blog.Comment", post=post, author=user, text="<i>ответ</i>\nещё"
+    )
+    expected_post = "&lt;b&gt;Первая&lt;/b&gt;<br>вторая"
+    expected_comment = "&lt;i&gt;ответ&lt;/i&gt;<br>ещё"
+    assert RenderedPost.objects.get(pk=post.pk).html == expected_post, (
+        "Убедитесь, что HTML текста поста сохраняется при сохранении поста."
+    )
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert expected_post in content and expected_comment in content
+
+    RenderedPost.objects.all().delete()
+    RenderedComment.objects.all().delete()
+    call_command("render_texts", batch_size=1, missing=True)
+    assert RenderedPost.objects.get(pk=post.pk).html == expected_post
+    assert list(
+        RenderedComment.objects.values_list("html", flat=True)
+    ) == [expected_comment], (
+        "Убедитесь, что команда render_texts заполняет HTML комментариев."
+    )
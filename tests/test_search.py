@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.utils import timezone
+
+from blog.search import search_posts
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_respects_visibility(
+        client, mixer, user, published_category
+):
+    def create(title, text, **kwargs):
+        fields = {
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            **kwargs,
+        }
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title=title, text=text, **fields
+        )
+
+    in_title = create("Ежи в лесу", "Про животных")
+    in_text = create("Заметка", "Видел <ежи> у дороги")
+    create("Ежи скрытые", "Скрытый пост", is_published=False)
+    create(
+        "Ежи будущие", "Отложенный пост",
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    renamed = create("Лисы", "Без совпадений")
+    renamed.title = "Ежи после правки"
+    renamed.save()
+
+    page = search_posts("ежи", per_page=2)
+    found = [post.pk for post in page]
+    assert found[0] == in_title.pk or found[0] == renamed.pk, (
+        "Убедитесь, что совпадения в заголовке ранжируются выше."
+    )
+    rest = search_posts("ежи", page.next_cursor, per_page=2)
+    assert sorted(found + [post.pk for post in rest]) == sorted(
+        [in_title.pk, in_text.pk, renamed.pk]
+    ), (
+        "Убедитесь, что поиск находит видимые посты, в том числе после"
+        " изменения заголовка, и не находит скрытые и отложенные."
+    )
+    assert not rest.has_next()
+    snippet = next(post.snippet for post in rest if post.pk == in_text.pk)
+    assert "<mark>ежи</mark>" in snippet and "&lt;" in snippet, (
+        "Убедитесь, что найденные слова подсвечиваются, а текст поста"
+        " экранируется."
+    )
+
+    response = client.get("/search/", {"q": 'ежи" OR'})
+    assert response.status_code == 200, (
+        "Убедитесь, что синтаксис FTS5 в запросе не приводит к ошибке."
+    )
+    assert client.get("/search/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_search_triggers_restored_after_migrate(
+        mixer, user, published_category
+):
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER blog_post_search_insert")
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, title="Барсук", text="Текст",
+        pub_date=timezone.now() - timedelta(days=1)
+    )
+    assert not search_posts("барсук")
+    emit_post_migrate_signal(0, False, "default")
+    assert list(search_posts("барсук")) == [post], (
+        "Убедитесь, что после миграций недостающие триггеры поиска"
+        " создаются заново, а индекс перестраивается."
+    )
@@ -0,0 +1,52 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_static_hashed_and_precompressed(client, settings, tmp_path):
+    content = client.get("/").content.decode("utf-8")
+    assert "/static/css/bootstrap.purged.min.css" in content, (
+        "Убедитесь, что до collectstatic страницы ссылаются на статику"
+        " по исходным именам."
+    )
+    assert "cdn.jsdelivr.net" not in content, (
+        "Убедитесь, что Bootstrap подключается из статики проекта."
+    )
+
+    settings.STATIC_ROOT = tmp_path
+    call_command("collectstatic", interactive=False, verbosity=0)
+    cache.clear()
+    content = client.get("/").content.decode("utf-8")
+    hashed = [
+        part.split('"')[0] for part in content.split('href="')[1:]
+        if part.startswith("/static/css/bootstrap.purged.min.")
+    ]
+    assert hashed and hashed[0] != "/static/css/bootstrap.purged.min.css", (
+        "Убедитесь, что после collectstatic в имени статики есть хеш."
+    )
+    url = hashed[0]
+    original = (tmp_path / url[len("/static/"):]).read_bytes()
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что клиентам с gzip отдаётся сжатая копия."
+    )
+    assert response["Content-Type"].startswith("text/css")
+    assert "immutable" in response["Cache-Control"]
+    assert "Accept-Encoding" in response["Vary"]
+    compressed = b"".join(response.streaming_content)
+    assert gzip.decompress(compressed) == original
+    assert len(compressed) < len(original) / 3
+
+    response = client.get(url)
+    assert not response.has_header("Content-Encoding")
+    assert b"".join(response.streaming_content) == original
+    response = client.get("/static/css/bootstrap.purged.min.css")
+    assert "immutable" not in response["Cache-Control"], (
+        "Убедитесь, что статика без хеша в имени не кэшируется бессрочно."
+    )
@@ -0,0 +1,28 @@
+from django.core.management import call_command
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+from blog.warmup import reset_template_cache, warm_up_templates
+
+
+def test_templates_compiled_into_cached_loader(capsys):
+    loaders = engines["django"].engine.template_loaders
+    assert any(isinstance(loader, CachedLoader) for loader in loaders), (
+        "Убедитесь, что шаблоны загружаются кэширующим загрузчиком."
+    )
+    reset_template_cache()
+    names = {name for name, seconds in warm_up_templates()}
+    assert {
+        "base.html", "includes/post_card.html", "includes/paginator.html",
+        "django_bootstrap5/field_errors.html",
+    } <= names, "Убедитесь, что прогрев компилирует все шаблоны проекта."
+    cache = next(
+        loader for loader in loaders if isinstance(loader, CachedLoader)
+    ).get_template_cache
+    assert "base.html" in cache and "blog/detail.html" in cache, (
+        "Убедитесь, что скомпилированные шаблоны попадают в кэш загрузчика."
+    )
+
+    call_command("template_timings", limit=3)
+    output = capsys.readouterr().out
+    assert "мс" in output and "Шаблонов:" in output
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import TitleTrigram
+from blog.trigrams import find_similar, similar_posts
+
+
+@pytest.mark.django_db
+def test_trigram_index_finds_misspelled_titles(
+        client, admin_client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, title="Путешествие по Карелии",
+        pub_date=timezone.now() - timedelta(days=1)
+    )
+    assert [p.pk for p in similar_posts("путишествие корелии")] == [
+        post.pk
+    ], "Убедитесь, что нечёткий поиск находит заголовок с опечатками."
+
+    post.title = "Поход на Алтай"
+    post.save()
+    assert not find_similar(TitleTrigram.POST, "путишествие корелии"), (
+        "Убедитесь, что индекс триграмм обновляется при изменении заголовка."
+    )
+    assert find_similar(TitleTrigram.POST, "похот на алтай")
+
+    response = client.get("/search/", {"q": "Похот Алтай"})
+    assert post.title in response.content.decode("utf-8"), (
+        "Убедитесь, что публичный поиск предлагает посты с похожими"
+        " заголовками."
+    )
+    response = admin_client.get("/admin/blog/post/", {"q": "Похот Алтай"})
+    assert post.title in response.content.decode("utf-8"), (
+        "Убедитесь, что поиск в админке находит похожие заголовки."
+    )
+
+    post.delete()
+    assert not TitleTrigram.objects.filter(
+        kind=TitleTrigram.POST
+    ).exists(), "Убедитесь, что триграммы удалённого поста удаляются."
@@ -0,0 +1,186 @@
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.test import RequestFactory
+from PIL import Image
+
+from blog.models import Post
+
+BOUNDARY = "upload-boundary"
+MB = 1024 * 1024
+
+
+def make_jpeg(size=(200, 100)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class LazyBody:
+    """Тело multipart-запроса, хвост файла которого создаётся при чтении."""
+
+    def __init__(self, content, padding):
+        self.parts = [
+            (
+                f"--{BOUNDARY}\r\n"
+                'Content-Disposition: form-data; name="title"\r\n\r\n'
+                f"Заголовок\r\n--{BOUNDARY}\r\n"
+                'Content-Disposition: form-data; name="image";'
+                ' filename="photo.jpg"\r\n'
+                "Content-Type: image/jpeg\r\n\r\n"
+            ).encode() + content,
+            padding,
+            f"\r\n--{BOUNDARY}--\r\n".encode(),
+        ]
+        self.length = len(self.parts[0]) + padding + len(self.parts[2])
+        self.position = 0
+
+    def read(self, size=-1):
+        if size < 0:
+            size = self.length - self.position
+        head, padding, tail = self.parts
+        data = b""
+        while len(data) < size and self.position < self.length:
+            wanted = size - len(data)
+            offset = self.position
+            if offset < len(head):
+                piece = head[offset:offset + wanted]
+            elif offset < len(head) + padding:
+                piece = b"\0" * min(wanted, len(head) + padding - offset)
+            else:
+                offset -= len(head) + padding
+                piece = tail[offset:offset + wanted]
+            data += piece
+            self.position += len(piece)
+        return data
+
+
+def upload(content, padding=0):
+    body = LazyBody(content, padding)
+    request = RequestFactory().request(**{
+        "REQUEST_METHOD": "POST",
+        "CONTENT_TYPE": f"multipart/form-data; boundary={BOUNDARY}",
+        "CONTENT_LENGTH": str(body.length),
+        "wsgi.input": body,
+    })
+    request.FILES
+    return request, body
+
+
+def test_valid_image_streamed_to_disk():
+    request, body = upload(make_jpeg(), padding=MB)
+    image = request.FILES["image"]
+    assert hasattr(image, "temporary_file_path"), (
+        "Убедитесь, что загружаемое изображение сразу пишется на диск."
+    )
+    assert image.size == len(make_jpeg()) + MB
+    assert not getattr(request, "upload_errors", None)
+    assert request.POST["title"] == "Заголовок"
+
+
+def test_multi_picture_jpeg_accepted():
+    buffer = BytesIO()
+    frame = Image.new("RGB", (64, 64))
+    frame.save(buffer, format="MPO", save_all=True, append_images=[frame])
+    request, body = upload(buffer.getvalue())
+    errors = getattr(request, "upload_errors", None)
+    assert "image" in request.FILES and not errors, (
+        "Убедитесь, что снимки JPEG с несколькими кадрами (MPO)"
+        " принимаются."
+    )
+
+
+@pytest.mark.parametrize("content", [
+    b"<?php echo 'not an image'; ?>" * 100,
+    b"\xff\xd8\xff" + b"\0" * 300 * 1024,
+    b"GIF",
+], ids=["text", "jpeg-without-size", "too-short"])
+def test_not_an_image_rejected(content):
+    request, body = upload(content)
+    assert "image" not in request.FILES and "image" in request.upload_errors, (
+        "Убедитесь, что файлы без заголовка изображения отклоняются."
+    )
+
+
+def test_pixel_limit_rejected_early(settings):
+    settings.MAX_IMAGE_PIXELS = 100 * 100
+    request, body = upload(make_jpeg(), padding=8 * MB)
+    assert "Мп" in request.upload_errors["image"]
+    assert body.position < MB, (
+        "Убедитесь, что изображение со слишком большими размерами"
+        " отклоняется по заголовку, без чтения всего запроса."
+    )
+
+
+@pytest.mark.parametrize("data_limit", [2621440, None])
+def test_size_limit_rejected_early(settings, data_limit):
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = data_limit
+    request, body = upload(make_jpeg(), padding=30 * MB)
+    assert "image" not in request.FILES and "image" in request.upload_errors
+    assert body.position < settings.MAX_IMAGE_UPLOAD_SIZE + MB, (
+        "Убедитесь, что загрузка прерывается, как только файл превысил"
+        " MAX_IMAGE_UPLOAD_SIZE."
+    )
+
+
+def test_concurrent_large_uploads_memory_bounded():
+    paddings = [9 * MB, 30 * MB] * 4
+    tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(max_workers=len(paddings)) as pool:
+            results = list(pool.map(
+                lambda padding: upload(make_jpeg(), padding), paddings
+            ))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    for padding, (request, body) in zip(paddings, results):
+        if padding < 10 * MB:
+            assert request.FILES["image"].size > padding
+        else:
+            assert "image" not in request.FILES
+    assert peak < 16 * MB, (
+        "Убедитесь, что одновременные большие загрузки не держат файлы"
+        f" в памяти: пик {peak // MB} МБ."
+    )
+
+
+@pytest.mark.django_db
+def test_post_form_shows_upload_error(
+        user_client, published_category, published_location
+):
+    response = user_client.post("/posts/create/", {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2000-01-01T00:00",
+        "category": published_category.id,
+        "location": published_location.id,
+        "image": BytesIO(b"not an image"),
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert not Post.objects.exists()
+    assert "JPEG, PNG, GIF или WebP" in response.content.decode(), (
+        "Убедитесь, что ошибка загрузки изображения выводится в форме."
+    )
+
+
+@pytest.mark.django_db
+def test_admin_post_form_shows_upload_error(admin_client, admin_user):
+    response = admin_client.post("/admin/blog/post/add/", {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date_0": "2000-01-01",
+        "pub_date_1": "00:00:00",
+        "author": admin_user.id,
+        "is_published": "on",
+        "image": BytesIO(b"not an image"),
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert not Post.objects.exists(), (
+        "Убедитесь, что админка не сохраняет пост, если загруженное"
+        " изображение отклонено."
+    )
+    assert "JPEG, PNG, GIF или WebP" in response.content.decode()